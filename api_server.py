@@ -0,0 +1,571 @@
+import argparse
+import asyncio
+import functools
+import json
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from records import Record
+from services import AppServices, CatalogSnapshot
+
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH_ITEMS = 1000
+MAX_HEADER_LINES = 100
+IDLE_TIMEOUT = 30.0
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"
+}
+
+
+class HTTPError(Exception):
+    """Error answered to the client with status and a JSON {'error': message} body"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: bytes, version: str):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.version = version
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get('connection', '').lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Any:
+        try:
+            return json.loads(self.body or b"null")
+        except (ValueError, UnicodeDecodeError) as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}")
+
+
+def encode_json(payload: Any) -> bytes:
+    """JSON body; catalog records are written as their JSON objects"""
+    return json.dumps(payload, default=_record_to_json, separators=(",", ":")).encode("utf-8")
+
+
+def _record_to_json(value: Any):
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# Workers forked from the server inherit its catalogs instead of loading their own
+FORK_CONTEXT = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+
+
+class BoundedExecutor:
+    """
+    Process pool for CPU-heavy work that admits at most max_pending jobs
+    Extraction, matching and search are pure Python, so only separate
+    processes run them in parallel; worker threads would serialize on the
+    GIL and compete with the event loop. Further jobs are refused with 503
+    instead of queueing without bound, so latency stays predictable under
+    overload. Only touched from the event loop, so the counters need no
+    lock.
+
+    Workers are started with initializer(*initargs_source()). When the
+    source returns different arguments, the next job goes to a new pool
+    started with them; the old pool finishes the jobs it already has and
+    exits.
+    """
+
+    def __init__(self, workers: int, max_pending: int, initializer: Optional[Callable] = None,
+                 initargs_source: Callable[[], Tuple] = tuple):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._initializer = initializer
+        self._initargs_source = initargs_source
+        self._initargs = initargs_source()
+        self._pool = self._new_pool()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=FORK_CONTEXT,
+                                   initializer=self._initializer, initargs=self._initargs)
+
+    def _refresh(self):
+        initargs = self._initargs_source()
+        if initargs != self._initargs:
+            old, self._initargs = self._pool, initargs
+            self._pool = self._new_pool()
+            old.shutdown(wait=False)
+            self.restarts += 1
+
+    async def run(self, fn: Callable, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(503, "Server is busy, retry later")
+        self._refresh()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+class MicroBatcher:
+    """
+    Coalesces single-item requests that arrive within max_delay seconds (or
+    until max_batch items are waiting) into one executor job
+    run_batch takes a list of items and returns one result per item.
+    """
+
+    def __init__(self, run_batch: Callable[[List], List], executor: BoundedExecutor,
+                 max_batch: int = 64, max_delay: float = 0.002):
+        self.run_batch = run_batch
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._waiting: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiting.append((item, future))
+        if len(self._waiting) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        waiting, self._waiting = self._waiting, []
+        if waiting:
+            asyncio.ensure_future(self._run(waiting))
+
+    async def _run(self, waiting: List[Tuple[Any, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(waiting)
+        try:
+            results = await self.executor.run(self.run_batch, [item for item, _ in waiting])
+        except Exception as e:
+            for _, future in waiting:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(waiting, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _require_string(value: Any, name: str) -> str:
+    if not isinstance(value, str):
+        raise HTTPError(400, f"'{name}' must be a string")
+    return value
+
+
+def _optional_int(value: Any, name: str, minimum: int = 0) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise HTTPError(400, f"'{name}' must be an integer >= {minimum}")
+    return value
+
+
+def _optional_number(value: Any, name: str, minimum: float = -math.inf, maximum: float = math.inf) -> Optional[float]:
+    """A finite number within [minimum, maximum]; json.loads accepts NaN and Infinity, so those are refused here"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise HTTPError(400, f"'{name}' must be a number")
+    value = float(value)
+    if not math.isfinite(value) or not minimum <= value <= maximum:
+        if math.isinf(minimum) and math.isinf(maximum):
+            raise HTTPError(400, f"'{name}' must be a finite number")
+        raise HTTPError(400, f"'{name}' must be a number between {minimum:g} and {maximum:g}")
+    return value
+
+
+# Catalogs of a worker process, set by _init_worker
+_worker_snapshot: Optional[CatalogSnapshot] = None
+
+
+def _init_worker(snapshot: Optional[CatalogSnapshot], diseases_path: str = '', hospitals_path: str = '',
+                 *catalog_versions):
+    """
+    Use the catalogs a forked worker inherited from the server, or load them
+    from the files where workers cannot be forked (catalog_versions only
+    make the arguments change when the server reloads the files)
+    """
+    global _worker_snapshot
+    _worker_snapshot = snapshot if snapshot is not None else AppServices(diseases_path, hospitals_path).snapshot()
+
+
+ITEM_FAILED = HTTPError(500, "Internal server error")
+
+
+def _guarded(call: Callable[..., Dict], *args) -> Any:
+    """Result of one batch item, or ITEM_FAILED, so one bad item cannot fail the items batched with it"""
+    try:
+        return call(*args)
+    except Exception as e:
+        print(f"API item error: {e!r}", file=sys.stderr)
+        return ITEM_FAILED
+
+
+def extract_batch(snapshot: CatalogSnapshot, texts: List[str]) -> List[Any]:
+    extractor = snapshot.symptom_extractor
+    return [_guarded(lambda text: {'symptoms': extractor.extract_symptoms(text)}, text) for text in texts]
+
+
+def diagnose_batch(snapshot: CatalogSnapshot, items: List[Tuple[List[str], Optional[int]]]) -> List[Any]:
+    engine = snapshot.diagnosis_engine
+    by_limit: Dict[Optional[int], List[int]] = {}
+    for slot, (_, limit) in enumerate(items):
+        by_limit.setdefault(limit, []).append(slot)
+
+    results: List[Any] = [None] * len(items)
+    for limit, slots in by_limit.items():
+        try:
+            matches = engine.match_symptoms_batch([items[slot][0] for slot in slots], limit=limit)
+        except Exception:
+            # Score the rows one at a time to find the one that failed
+            matches = [_guarded(engine.match_symptoms, items[slot][0], limit) for slot in slots]
+        for slot, ranked in zip(slots, matches):
+            results[slot] = ranked if ranked is ITEM_FAILED else {'matches': ranked}
+    return results
+
+
+def _nearby(finder, query: Dict) -> Dict:
+    offset, limit = query['offset'], query['limit']
+    hospitals = finder.rank_nearby_hospitals(query['disease'], query['user_coords'], query['city'],
+                                             query['max_distance'], query['sort_by'], limit=offset + limit)
+    return {'total': hospitals.total, 'hospitals': list(hospitals[offset:offset + limit])}
+
+
+def nearby_batch(snapshot: CatalogSnapshot, queries: List[Dict]) -> List[Any]:
+    finder = snapshot.hospital_finder
+    return [_guarded(_nearby, finder, query) for query in queries]
+
+
+BATCH_FUNCTIONS: Dict[str, Callable[[CatalogSnapshot, List], List[Any]]] = {
+    "/extract": extract_batch,
+    "/diagnose": diagnose_batch,
+    "/hospitals/nearby": nearby_batch,
+}
+
+
+def _encode_result(result: Any) -> Tuple[int, bytes]:
+    if result is not ITEM_FAILED:
+        try:
+            return 200, encode_json(result)
+        except Exception as e:
+            print(f"API item error: {e!r}", file=sys.stderr)
+    return ITEM_FAILED.status, encode_json({'error': ITEM_FAILED.message})
+
+
+def _run_job(path: str, items: List) -> List[Tuple[int, bytes]]:
+    """
+    Executor job: run one endpoint's batch on the worker's catalogs and
+    return each result as (status, encoded body), so records never cross
+    the process boundary. Every job reads one catalog snapshot, so a hot
+    reload never mixes two catalog versions within a batch.
+    """
+    results = BATCH_FUNCTIONS[path](_worker_snapshot, items)
+    return [_encode_result(result) for result in results]
+
+
+class TriageAPI:
+    """
+    JSON endpoints over the catalogs
+
+    POST /extract            {"text": str}
+    POST /diagnose           {"symptoms": [str], "limit": int}
+    POST /hospitals/nearby   {"disease": str, "lat": float, "lon": float, "city": str,
+                              "max_distance": float, "sort_by": str, "limit": int, "offset": int}
+    GET  /health
+
+    Each POST endpoint also takes {"batch": [item, ...]} and answers
+    {"results": [result, ...]} in the same order; an item that fails is
+    answered with {"error": message} in its place. Single requests arriving
+    together are batched on the server as well.
+
+    The server process loads the catalogs once and watches the files every
+    reload_interval seconds (0 disables reloading). The work runs in worker
+    processes forked from it, which share its catalogs and indexes copy-on-
+    write instead of building their own; the server itself never runs
+    extraction, matching or search, so no catalog lock is held when a
+    worker forks. After a reload the next job starts a new set of workers
+    from the new catalogs. Where fork is unavailable, each worker loads the
+    files instead.
+    """
+
+    def __init__(self, diseases_path: str = 'diseases.json', hospitals_path: str = 'hospitals.json',
+                 workers: int = 4, max_pending: int = 64, max_batch: int = 64, batch_delay: float = 0.002,
+                 reload_interval: float = 5.0):
+        self.services = AppServices(diseases_path, hospitals_path)
+        if reload_interval > 0:
+            self.services.start_watching(reload_interval)
+        self.executor = BoundedExecutor(workers, max_pending, _init_worker, self._worker_initargs)
+        self.parsers: Dict[str, Callable[[Any], Any]] = {
+            "/extract": self._parse_extract,
+            "/diagnose": self._parse_diagnose,
+            "/hospitals/nearby": self._parse_nearby,
+        }
+        self.batchers = {
+            path: MicroBatcher(functools.partial(_run_job, path), self.executor, max_batch, batch_delay)
+            for path in self.parsers
+        }
+
+    def _worker_initargs(self) -> Tuple:
+        snapshot = self.services.snapshot()
+        if FORK_CONTEXT is not None:
+            # Inherited through fork, never pickled
+            return (snapshot,)
+        return (None, self.services.diseases_path, self.services.hospitals_path,
+                snapshot.diseases_version, snapshot.hospitals_version)
+
+    # Request parsing (event loop)
+
+    @staticmethod
+    def _parse_extract(item: Any) -> str:
+        if not isinstance(item, dict):
+            raise HTTPError(400, "Expected a JSON object")
+        return _require_string(item.get('text'), 'text')
+
+    @staticmethod
+    def _parse_diagnose(item: Any) -> Tuple[List[str], Optional[int]]:
+        if not isinstance(item, dict):
+            raise HTTPError(400, "Expected a JSON object")
+        symptoms = item.get('symptoms')
+        if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+            raise HTTPError(400, "'symptoms' must be a list of strings")
+        return symptoms, _optional_int(item.get('limit'), 'limit', 1)
+
+    @staticmethod
+    def _parse_nearby(item: Any) -> Dict:
+        if not isinstance(item, dict):
+            raise HTTPError(400, "Expected a JSON object")
+        lat = _optional_number(item.get('lat'), 'lat', -90.0, 90.0)
+        lon = _optional_number(item.get('lon'), 'lon', -180.0, 180.0)
+        if (lat is None) != (lon is None):
+            raise HTTPError(400, "'lat' and 'lon' must be given together")
+        city = item.get('city')
+        if city is not None:
+            _require_string(city, 'city')
+        sort_by = item.get('sort_by', "distance")
+        if sort_by not in ("distance", "rating"):
+            raise HTTPError(400, "'sort_by' must be 'distance' or 'rating'")
+        max_distance = _optional_number(item.get('max_distance'), 'max_distance', 0.0)
+        limit = _optional_int(item.get('limit'), 'limit', 1)
+        return {
+            'disease': _require_string(item.get('disease'), 'disease'),
+            'user_coords': (lat, lon) if lat is not None else None,
+            'city': city or None,
+            'max_distance': 50.0 if max_distance is None else max_distance,
+            'sort_by': sort_by,
+            'limit': 10 if limit is None else limit,
+            'offset': _optional_int(item.get('offset'), 'offset') or 0
+        }
+
+    # Routing
+
+    async def dispatch(self, request: Request) -> Tuple[int, bytes]:
+        try:
+            path = urlsplit(request.path).path.rstrip("/") or "/"
+            if path == "/health":
+                if request.method != "GET":
+                    raise HTTPError(405, "Use GET")
+                return 200, encode_json(self.health())
+
+            parse = self.parsers.get(path)
+            if parse is None:
+                raise HTTPError(404, f"No endpoint {path}")
+            if request.method != "POST":
+                raise HTTPError(405, "Use POST")
+
+            payload = request.json()
+            if isinstance(payload, dict) and 'batch' in payload:
+                batch = payload['batch']
+                if not isinstance(batch, list):
+                    raise HTTPError(400, "'batch' must be a list")
+                if len(batch) > MAX_BATCH_ITEMS:
+                    raise HTTPError(413, f"At most {MAX_BATCH_ITEMS} items per batch")
+                items = [parse(item) for item in batch]
+                results = await self.executor.run(_run_job, path, items)
+                return 200, b'{"results":[' + b",".join(body for _, body in results) + b"]}"
+
+            return await self.batchers[path].submit(parse(payload))
+        except HTTPError as e:
+            return e.status, encode_json({'error': e.message})
+        except Exception as e:
+            print(f"API error on {request.method} {request.path}: {e!r}", file=sys.stderr)
+            return 500, encode_json({'error': "Internal server error"})
+
+    def health(self) -> Dict:
+        snapshot = self.services.snapshot()
+        return {
+            'status': "ok",
+            'diseases': len(snapshot.diagnosis_engine.diseases),
+            'hospitals': len(snapshot.hospital_finder.hospitals),
+            'executor': {
+                'workers': self.executor.workers,
+                'pending': self.executor.pending,
+                'max_pending': self.executor.max_pending,
+                'completed': self.executor.completed,
+                'rejected': self.executor.rejected,
+                'restarts': self.executor.restarts
+            },
+            'batching': {
+                path: {'batches': batcher.batches, 'items': batcher.items}
+                for path, batcher in self.batchers.items()
+            }
+        }
+
+    # HTTP/1.1 transport
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+                except HTTPError as e:
+                    write_response(writer, e.status, encode_json({'error': e.message}), keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                status, body = await self.dispatch(request)
+                write_response(writer, status, body, request.keep_alive)
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def shutdown(self):
+        self.services.stop_watching()
+        self.executor.shutdown()
+
+
+async def read_line(reader: asyncio.StreamReader) -> bytes:
+    """One line of the request head; lines longer than the reader's limit are a client error"""
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HTTPError(400, "Request line or header too long")
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read one HTTP/1.x request; None when the client closed the connection"""
+    line = await read_line(reader)
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    if not version.startswith("HTTP/1."):
+        raise HTTPError(400, "Unsupported HTTP version")
+
+    headers: Dict[str, str] = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await read_line(reader)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(400, "Too many headers")
+
+    if 'transfer-encoding' in headers:
+        raise HTTPError(400, "Chunked request bodies are not supported; send Content-Length")
+    try:
+        length = int(headers.get('content-length', "0"))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"Body larger than {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, headers, body, version)
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, body: bytes, keep_alive: bool):
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def serve(api: TriageAPI, host: str, port: int):
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    for sock in server.sockets:
+        print(f"Serving on http://{sock.getsockname()[0]}:{sock.getsockname()[1]}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.shutdown()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Serve symptom extraction, diagnosis and hospital search over HTTP"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Worker processes for extraction, matching and search")
+    parser.add_argument("--diseases", default="diseases.json", help="Disease catalog JSON")
+    parser.add_argument("--hospitals", default="hospitals.json", help="Hospital registry JSON")
+    parser.add_argument("--max-pending", type=int, default=64,
+                        help="Executor jobs admitted at once; more are answered with 503")
+    parser.add_argument("--batch-size", type=int, default=64,
+                        help="Most single requests coalesced into one executor job")
+    parser.add_argument("--batch-delay-ms", type=float, default=2.0,
+                        help="How long a single request waits for others to batch with")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    api = TriageAPI(args.diseases, args.hospitals, max(args.workers, 1), max(args.max_pending, 1),
+                    max(args.batch_size, 1), max(args.batch_delay_ms, 0.0) / 1000,
+                    float(os.environ.get("WATERWISE_RELOAD_INTERVAL", "5")))
+    try:
+        asyncio.run(serve(api, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
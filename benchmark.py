@@ -0,0 +1,344 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from diagnosis_engine import DiagnosisEngine, SymptomExtractor
+from hospital_finder import HospitalFinder, StaticLocationProvider
+
+
+# Catalog and workload sizes for each named scale; 'selections' are
+# match_symptoms calls and 'searches' are find_nearby_hospitals calls
+SCALES = {
+    'small': {'diseases': 20, 'symptoms': 60, 'keywords': 4, 'hospitals': 1000,
+              'notes': 2000, 'selections': 1000, 'searches': 200},
+    'medium': {'diseases': 200, 'symptoms': 300, 'keywords': 6, 'hospitals': 20000,
+               'notes': 5000, 'selections': 2000, 'searches': 100},
+    'large': {'diseases': 1000, 'symptoms': 1000, 'keywords': 8, 'hospitals': 100000,
+              'notes': 10000, 'selections': 5000, 'searches': 50},
+}
+
+# (city, state, lat, lon, spread in degrees): hospitals cluster around real cities
+CITY_CENTERS = [
+    ("Mumbai", "Maharashtra", 19.0760, 72.8777, 0.15), ("Delhi", "Delhi", 28.6139, 77.2090, 0.20),
+    ("Bengaluru", "Karnataka", 12.9716, 77.5946, 0.15), ("Hyderabad", "Telangana", 17.3850, 78.4867, 0.15),
+    ("Chennai", "Tamil Nadu", 13.0827, 80.2707, 0.12), ("Kolkata", "West Bengal", 22.5726, 88.3639, 0.12),
+    ("Pune", "Maharashtra", 18.5204, 73.8567, 0.10), ("Ahmedabad", "Gujarat", 23.0225, 72.5714, 0.10),
+    ("Jaipur", "Rajasthan", 26.9124, 75.7873, 0.10), ("Lucknow", "Uttar Pradesh", 26.8467, 80.9462, 0.10),
+    ("Patna", "Bihar", 25.5941, 85.1376, 0.08), ("Bhopal", "Madhya Pradesh", 23.2599, 77.4126, 0.08),
+    ("Guwahati", "Assam", 26.1445, 91.7362, 0.08), ("Kochi", "Kerala", 9.9312, 76.2673, 0.08),
+]
+
+SPECIALIZATIONS = [
+    "Infectious Diseases", "Gastroenterology", "General Medicine", "Emergency Medicine", "General Physician",
+    "Hepatology", "Liver Specialist", "Pediatrics", "Internal Medicine", "Critical Care", "Nephrology",
+    "Microbiology"
+]
+
+SYLLABLES = ["ab", "bel", "cor", "dra", "en", "fis", "gal", "hem", "ir", "jun", "kel", "lor", "mar", "nex",
+             "op", "pra", "qui", "ros", "sul", "tor", "ur", "vin", "wal", "xen", "yor", "zel"]
+
+URGENCIES = ["immediate", "high", "medium"]
+
+NOTE_OPENERS = ["Patient reports", "Complains of", "Presented with", "Mother says child has", "Reports",
+                "History of", "Since 2 days"]
+NOTE_MODIFIERS = ["", "", "", "mild ", "severe ", "slight ", "persistent ", "intense "]
+NOTE_NEGATIONS = ["no ", "denies ", "not ", "without "]
+NOTE_SEPARATORS = [", ", "; ", " and ", ". "]
+
+
+def make_word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables))
+
+
+def generate_symptom_db(rng: random.Random, symptoms: int, keywords: int) -> Dict[str, List[str]]:
+    """Synthetic symptom name -> keyword list, with one- to three-word keywords"""
+    symptom_db: Dict[str, List[str]] = {}
+    seen = set()
+    while len(symptom_db) < symptoms:
+        name = f"{make_word(rng, 2)} {make_word(rng, 2)}".capitalize()
+        terms = []
+        while len(terms) < keywords:
+            term = " ".join(make_word(rng, rng.randint(2, 3)) for _ in range(rng.randint(1, 3)))
+            if term not in seen:
+                seen.add(term)
+                terms.append(term)
+        symptom_db.setdefault(name, terms)
+    return symptom_db
+
+
+def generate_diseases(rng: random.Random, diseases: int, symptom_names: Sequence[str]) -> Dict:
+    """Synthetic disease catalog in the diseases.json format"""
+    severities = ["low", "medium", "high", "critical"]
+    entries = []
+    for i in range(diseases):
+        symptoms = rng.sample(list(symptom_names), min(len(symptom_names), rng.randint(3, 8)))
+        entries.append({
+            'id': f"disease_{i:05d}",
+            'name': f"{make_word(rng, 3).capitalize()} {i}",
+            'category': rng.choice(["bacterial", "viral", "parasitic"]),
+            'severity': rng.choice(severities),
+            'transmission': "waterborne",
+            'symptoms': [{'symptom': s, 'severity': rng.choice(severities)} for s in symptoms],
+            'homeRemedies': [{'remedy': "Oral rehydration solution", 'instructions': "Small sips",
+                              'frequency': "Every 2 hours"}],
+            'consultDoctor': {
+                'required': True,
+                'urgency': rng.choice(URGENCIES),
+                'reason': "Synthetic consultation advice"
+            }
+        })
+    return {
+        'metadata': {'version': "bench", 'totalDiseases': diseases},
+        'diseases': entries
+    }
+
+
+def generate_hospitals(rng: random.Random, hospitals: int, disease_names: Sequence[str]) -> Dict:
+    """Synthetic hospital registry in the hospitals.json format, clustered around CITY_CENTERS"""
+    entries = []
+    for i in range(hospitals):
+        city, state, lat, lon, spread = rng.choice(CITY_CENTERS)
+        entry = {
+            'id': f"h{i:06d}",
+            'name': f"{make_word(rng, 3).capitalize()} Hospital",
+            'type': rng.choice(["Multi-Specialty Hospital", "Government Hospital", "Clinic"]),
+            'specializations': rng.sample(SPECIALIZATIONS, rng.randint(1, 4)),
+            'address': f"{rng.randint(1, 999)} {make_word(rng, 2).capitalize()} Road",
+            'city': city,
+            'state': state,
+            'pincode': str(rng.randint(100000, 999999)),
+            'phone': f"+91 {rng.randint(1000000000, 9999999999)}",
+            'rating': round(rng.uniform(2.5, 5.0), 1),
+            'timings': "24/7",
+            'services': ["Emergency", "Pharmacy"]
+        }
+        # A few registry entries have no coordinates, as in real data
+        if rng.random() > 0.02:
+            entry['lat'] = round(rng.gauss(lat, spread), 6)
+            entry['lon'] = round(rng.gauss(lon, spread), 6)
+        entries.append(entry)
+    return {
+        'metadata': {'version': "bench", 'totalHospitals': hospitals},
+        'diseaseSpecializationMapping': {
+            name: rng.sample(SPECIALIZATIONS, rng.randint(1, 3)) for name in disease_names
+        },
+        'hospitals': entries
+    }
+
+
+def generate_notes(rng: random.Random, notes: int, symptom_db: Dict[str, List[str]]) -> List[str]:
+    """Synthetic free-text intake notes mentioning, negating and qualifying symptom keywords"""
+    keywords = [term for terms in symptom_db.values() for term in terms]
+    texts = []
+    for _ in range(notes):
+        clauses = []
+        for _ in range(rng.randint(1, 6)):
+            if rng.random() < 0.2:
+                clauses.append(rng.choice(NOTE_NEGATIONS) + rng.choice(keywords))
+            elif rng.random() < 0.1:
+                clauses.append(f"{make_word(rng, 2)} {make_word(rng, 3)}")
+            else:
+                clauses.append(rng.choice(NOTE_MODIFIERS) + rng.choice(keywords))
+        text = clauses[0]
+        for clause in clauses[1:]:
+            text += rng.choice(NOTE_SEPARATORS) + clause
+        texts.append(f"{rng.choice(NOTE_OPENERS)} {text}")
+    return texts
+
+
+def generate_symptom_selections(rng: random.Random, count: int, symptom_names: Sequence[str]) -> List[List[str]]:
+    """Symptom lists as the symptom page would send them to match_symptoms"""
+    return [rng.sample(list(symptom_names), rng.randint(1, 6)) for _ in range(count)]
+
+
+def generate_hospital_queries(rng: random.Random, count: int,
+                              disease_names: Sequence[str]) -> List[Tuple[str, Tuple[float, float]]]:
+    """(disease name, user coordinates) pairs near the generated cities"""
+    queries = []
+    for _ in range(count):
+        _, _, lat, lon, spread = rng.choice(CITY_CENTERS)
+        queries.append((rng.choice(disease_names), (rng.gauss(lat, spread), rng.gauss(lon, spread))))
+    return queries
+
+
+def time_calls(call: Callable, inputs: Sequence) -> Tuple[float, List[float]]:
+    """Total seconds and per-call latencies for one pass over inputs, with GC paused"""
+    latencies = []
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for item in inputs:
+            t0 = time.perf_counter()
+            call(item)
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return elapsed, latencies
+
+
+def measure(call: Callable, inputs: Sequence, repeat: int = 3, warmup: int = 20) -> Dict[str, float]:
+    """
+    Run call once per input and report throughput and latency percentiles
+    The first warmup inputs are run untimed first. Of repeat passes the
+    fastest is reported, as timeit does, since slower passes mostly
+    measure interference from the rest of the machine.
+    """
+    for item in inputs[:warmup]:
+        call(item)
+
+    elapsed, latencies = min((time_calls(call, inputs) for _ in range(max(repeat, 1))), key=lambda run: run[0])
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'calls': len(inputs),
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(len(inputs) / elapsed, 2) if elapsed else None,
+        'mean_ms': round(float(latencies_ms.mean()), 6),
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 6),
+        'p99_ms': round(float(np.percentile(latencies_ms, 99)), 6),
+        'max_ms': round(float(latencies_ms.max()), 6)
+    }
+
+
+def run_scale(name: str, sizes: Dict[str, int], seed: int, distance_mode: str, cache_size: int,
+              repeat: int, workdir: str) -> Dict:
+    """Generate one scale's catalogs and workloads and benchmark every component on them"""
+    rng = random.Random(f"{seed}:{name}")
+    symptom_db = generate_symptom_db(rng, sizes['symptoms'], sizes['keywords'])
+    symptom_names = list(symptom_db)
+    diseases_data = generate_diseases(rng, sizes['diseases'], symptom_names)
+    disease_names = [d['name'] for d in diseases_data['diseases']]
+    hospitals_data = generate_hospitals(rng, sizes['hospitals'], disease_names)
+    notes = generate_notes(rng, sizes['notes'], symptom_db)
+    selections = generate_symptom_selections(rng, sizes['selections'], symptom_names)
+    queries = generate_hospital_queries(rng, sizes['searches'], disease_names)
+
+    hospitals_path = os.path.join(workdir, f"hospitals-{name}.json")
+    with open(hospitals_path, 'w') as f:
+        json.dump(hospitals_data, f)
+
+    results = {}
+
+    start = time.perf_counter()
+    extractor = SymptomExtractor(symptom_db, cache_size=cache_size)
+    engine = DiagnosisEngine(diseases_data, cache_size=cache_size)
+    finder = HospitalFinder(distance_mode, location_provider=StaticLocationProvider(None),
+                            data_path=hospitals_path)
+    results['build_seconds'] = round(time.perf_counter() - start, 6)
+
+    results['extract_symptoms'] = measure(extractor.extract_symptoms, notes, repeat)
+    results['match_symptoms'] = measure(lambda symptoms: engine.match_symptoms(symptoms, limit=1), selections,
+                                        repeat)
+    # Read the first page of results, as the hospital page does
+    results['find_nearby_hospitals'] = measure(
+        lambda query: finder.rank_nearby_hospitals(query[0], user_coords=query[1])[:10], queries, repeat
+    )
+    return results
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compare p50 latency against a baseline run
+    Returns one line per benchmark; lines for regressions beyond threshold
+    (a fraction, e.g. 0.2 for 20%) start with 'REGRESSION'.
+    """
+    lines = []
+    for scale, benchmarks in current['results'].items():
+        base_benchmarks = baseline.get('results', {}).get(scale)
+        if base_benchmarks is None:
+            continue
+        for benchmark, stats in benchmarks.items():
+            base = base_benchmarks.get(benchmark)
+            if not isinstance(stats, dict) or not isinstance(base, dict) or not base.get('p50_ms'):
+                continue
+            change = stats['p50_ms'] / base['p50_ms'] - 1
+            label = "REGRESSION" if change > threshold else "ok"
+            lines.append(f"{label:<10} {scale}/{benchmark}: p50 {base['p50_ms']:.4f} -> {stats['p50_ms']:.4f} ms "
+                         f"({change:+.1%}), p99 {base['p99_ms']:.4f} -> {stats['p99_ms']:.4f} ms")
+    return lines
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark symptom extraction, diagnosis and hospital search on synthetic catalogs"
+    )
+    parser.add_argument("--scales", default="small,medium",
+                        help=f"Comma-separated scales to run ({', '.join(SCALES)})")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic data")
+    parser.add_argument("--distance-mode", choices=HospitalFinder.DISTANCE_MODES, default="geodesic",
+                        help="HospitalFinder distance mode")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="Extractor and engine cache sizes (default 0 measures uncached work)")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per benchmark; the fastest is reported")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare p50 latency against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Slowdown that counts as a regression, as a fraction (default 0.20)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        print(f"Unknown scale(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    report = {
+        'metadata': {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'distance_mode': args.distance_mode,
+            'cache_size': args.cache_size,
+            'repeat': args.repeat,
+            'scales': {name: SCALES[name] for name in scales}
+        },
+        'results': {}
+    }
+
+    with tempfile.TemporaryDirectory(prefix="waterwise-bench-") as workdir:
+        for name in scales:
+            results = run_scale(name, SCALES[name], args.seed, args.distance_mode, args.cache_size,
+                                args.repeat, workdir)
+            report['results'][name] = results
+            print(f"[{name}] catalogs built in {results['build_seconds']:.2f} s")
+            for benchmark, stats in results.items():
+                if isinstance(stats, dict):
+                    print(f"[{name}] {benchmark:<22} {stats['ops_per_sec']:>10.1f} ops/s  "
+                          f"p50 {stats['p50_ms']:.4f} ms  p99 {stats['p99_ms']:.4f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        lines = compare(report, baseline, args.threshold)
+        for line in lines:
+            print(line)
+        if any(line.startswith("REGRESSION") for line in lines):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,546 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence as SequenceABC
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+
+from records import Disease, Hospital, Record
+
+
+MAGIC = b"SNISCAT\0"
+FORMAT_VERSION = 3
+SNAPSHOT_SUFFIX = ".snapshot"
+_ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+# Column types used for catalog records; a record list holds nested records in columns of its own
+FLOAT, INT, STRING, STRING_LIST, RECORD_LIST, JSON = "float", "int", "str", "strlist", "records", "json"
+_INT64 = np.iinfo(np.int64)
+
+# Errors that reading a damaged header or column can raise
+_CORRUPTION_ERRORS = (KeyError, IndexError, TypeError, ValueError, UnicodeDecodeError)
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or of an unknown version"""
+
+
+def snapshot_path_for(json_path: str) -> str:
+    """Snapshot file that belongs to a JSON catalog (diseases.json -> diseases.snapshot)"""
+    return os.path.splitext(json_path)[0] + SNAPSHOT_SUFFIX
+
+
+def snapshot_is_fresh(json_path: str) -> bool:
+    """True if the catalog's snapshot exists and is newer than its JSON file"""
+    try:
+        snapshot_mtime = os.stat(snapshot_path_for(json_path)).st_mtime_ns
+    except OSError:
+        return False
+    try:
+        return snapshot_mtime > os.stat(json_path).st_mtime_ns
+    except OSError:
+        return True
+
+
+def write_snapshot(path: str, kind: str, arrays: Dict[str, np.ndarray], meta: Dict):
+    """
+    Write arrays and a small JSON header to a snapshot file
+    Layout: magic, format version, header length, header JSON, then each
+    array at a 64-byte aligned offset recorded in the header.
+    """
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    header = json.dumps({'kind': kind, 'arrays': layout, 'meta': meta}).encode("utf-8")
+    data_start = -(-(_PREAMBLE.size + len(header)) // _ALIGNMENT) * _ALIGNMENT
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+class Snapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file; arrays are zero-copy
+    views of the mapping, so processes opening the same file share its pages
+    through the OS page cache
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < _PREAMBLE.size:
+                    raise SnapshotError(f"Truncated snapshot {path}")
+                # The mapping stays valid after the file is closed, and after
+                # write_snapshot replaces the file with a new one
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as e:
+            raise SnapshotError(f"Cannot read snapshot {path}: {e}")
+
+        if len(self._buffer) < _PREAMBLE.size:
+            raise SnapshotError(f"Truncated snapshot {path}")
+        magic, version, header_length = _PREAMBLE.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a catalog snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"{path} has snapshot format {version}, expected {FORMAT_VERSION}")
+
+        header_end = _PREAMBLE.size + header_length
+        if header_end > len(self._buffer):
+            raise SnapshotError(f"Truncated snapshot {path}")
+        try:
+            header = json.loads(bytes(self._buffer[_PREAMBLE.size:header_end]).decode("utf-8"))
+            self.kind: str = header['kind']
+            self.meta: Dict = header['meta']
+            self._arrays: Dict = header['arrays']
+        except _CORRUPTION_ERRORS as e:
+            raise SnapshotError(f"Corrupt snapshot header in {path}: {e}")
+        self._data_start = -(-header_end // _ALIGNMENT) * _ALIGNMENT
+        self._views: Dict[str, np.ndarray] = {}
+
+    def array(self, name: str) -> np.ndarray:
+        """Return a named read-only array without copying it"""
+        view = self._views.get(name)
+        if view is not None:
+            return view
+        try:
+            spec = self._arrays[name]
+        except KeyError:
+            raise SnapshotError(f"{self.path} has no array '{name}'")
+        try:
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape'], dtype=np.int64))
+            end = self._data_start + spec['offset'] + count * dtype.itemsize
+            if end > len(self._buffer):
+                raise SnapshotError(f"Truncated snapshot {self.path}")
+            array = np.frombuffer(self._buffer, dtype=dtype, count=count, offset=self._data_start + spec['offset'])
+            view = self._views[name] = array.reshape(spec['shape'])
+        except _CORRUPTION_ERRORS as e:
+            raise SnapshotError(f"Corrupt array '{name}' in {self.path}: {e}")
+        return view
+
+
+class StringTable:
+    """
+    Interned UTF-8 strings stored as one byte blob plus offsets
+    Recently used strings are kept decoded; the rest stay in the blob.
+    """
+
+    CACHE_SIZE = 8192
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+        self._decode = lru_cache(maxsize=self.CACHE_SIZE)(self._decode_uncached)
+
+    @staticmethod
+    def build(strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode strings into (blob, offsets) arrays"""
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return blob, offsets
+
+    def _decode_uncached(self, string_id: int) -> str:
+        start, end = int(self._offsets[string_id]), int(self._offsets[string_id + 1])
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def __getitem__(self, string_id: int) -> str:
+        return self._decode(string_id)
+
+
+def intern_specializations(specialization_lists: Sequence[Sequence[str]]) -> Tuple[List[str], List[int]]:
+    """
+    Give each lowercased specialization a bit number in order of first use
+    Returns (names in bit order, one integer bitmask per hospital)
+    """
+    bits: Dict[str, int] = {}
+    masks = []
+    for specs in specialization_lists:
+        mask = 0
+        for spec in specs:
+            mask |= 1 << bits.setdefault(spec.lower(), len(bits))
+        masks.append(mask)
+    return list(bits), masks
+
+
+class HospitalColumns:
+    """
+    Per-hospital columns that HospitalFinder builds its indexes from, so the
+    same code serves registries loaded from JSON or from a snapshot
+    """
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, specialization_names: List[str],
+                 specialization_masks: List[int], cities: List[Optional[str]],
+                 states: List[Optional[str]], pincodes: List[Optional[str]], ratings: np.ndarray):
+        self.lats = lats
+        self.lons = lons
+        self.specialization_names = specialization_names
+        self.specialization_masks = specialization_masks
+        self.cities = cities
+        self.states = states
+        self.pincodes = pincodes
+        self.ratings = ratings
+
+    @classmethod
+    def from_records(cls, hospitals: Sequence[Dict]) -> "HospitalColumns":
+        """Derive columns from hospital dicts as loaded from JSON"""
+        # Falsy coordinates count as missing, like the rest of HospitalFinder
+        has_coords = [bool(h.get('lat') and h.get('lon')) for h in hospitals]
+        lats = np.array([h['lat'] if has else np.nan for h, has in zip(hospitals, has_coords)], dtype=np.float64)
+        lons = np.array([h['lon'] if has else np.nan for h, has in zip(hospitals, has_coords)], dtype=np.float64)
+        names, masks = intern_specializations([h.get('specializations', []) for h in hospitals])
+        pincodes = [str(h['pincode']) if h.get('pincode') else None for h in hospitals]
+        ratings = np.array([h.get('rating') or 0 for h in hospitals], dtype=np.float64)
+        return cls(lats, lons, names, masks, [h.get('city') for h in hospitals],
+                   [h.get('state') for h in hospitals], pincodes, ratings)
+
+
+def _field_type(values: List) -> str:
+    """Pick the column type that can hold every present value of a field"""
+    if all(isinstance(v, int) and not isinstance(v, bool) and _INT64.min <= v <= _INT64.max for v in values):
+        return INT
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return FLOAT
+    if all(isinstance(v, str) for v in values):
+        return STRING
+    if all(isinstance(v, list) and all(isinstance(i, str) for i in v) for v in values):
+        return STRING_LIST
+    if all(isinstance(v, list) and all(isinstance(i, dict) for i in v) for v in values):
+        return RECORD_LIST
+    return JSON
+
+
+def encode_columns(rows: Sequence[Dict], intern: Callable[[str], int],
+                   prefix: str = "col.") -> Tuple[Dict[str, np.ndarray], List]:
+    """
+    Store a list of JSON objects column by column
+    Returns the arrays (named prefix + field) and the field list
+    [[name, type], ...]; record list fields also carry the field list of
+    their nested records, which are stored under prefix + field + '/'.
+    Strings are stored as ids from intern.
+    """
+    count = len(rows)
+    fields: Dict[str, None] = {}
+    for row in rows:
+        for key in row:
+            fields.setdefault(key, None)
+
+    arrays: Dict[str, np.ndarray] = {}
+    field_types = []
+    for name in fields:
+        present = [row[name] for row in rows if row.get(name) is not None]
+        kind = _field_type(present)
+        values = [row.get(name) for row in rows]
+        column = f"{prefix}{name}"
+
+        if kind == FLOAT:
+            arrays[column] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        elif kind == INT:
+            arrays[column] = np.array([0 if v is None else v for v in values], dtype=np.int64)
+            arrays[f"{column}.present"] = np.array([v is not None for v in values], dtype=np.bool_)
+        elif kind in (STRING_LIST, RECORD_LIST):
+            lengths = [len(v) if v is not None else 0 for v in values]
+            offsets = np.zeros(count + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            arrays[f"{column}.offsets"] = offsets
+            items = [item for v in values if v is not None for item in v]
+            if kind == STRING_LIST:
+                arrays[f"{column}.values"] = np.array([intern(item) for item in items], dtype=np.int32)
+            else:
+                nested_arrays, nested_fields = encode_columns(items, intern, f"{column}/")
+                arrays.update(nested_arrays)
+                field_types.append([name, kind, nested_fields])
+                continue
+        else:
+            if kind == JSON:
+                values = [None if v is None else json.dumps(v) for v in values]
+            arrays[column] = np.array([-1 if v is None else intern(v) for v in values], dtype=np.int32)
+        field_types.append([name, kind])
+    return arrays, field_types
+
+
+class StringInterner:
+    """Assigns ids to strings in order of first use, for a StringTable"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        return self.ids.setdefault(value, len(self.ids))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        blob, offsets = StringTable.build(list(self.ids))
+        return {"strings.blob": blob, "strings.offsets": offsets}
+
+
+def encode_hospitals(hospitals_data: Dict) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Compile a hospital catalog into columnar arrays plus a string table, with
+    the specialization bitmasks precomputed
+    """
+    hospitals = hospitals_data.get('hospitals', [])
+    count = len(hospitals)
+    intern = StringInterner()
+    arrays, field_types = encode_columns(hospitals, intern)
+
+    names, masks = intern_specializations([h.get('specializations', []) for h in hospitals])
+    words = max(1, -(-len(names) // 64))
+    mask_words = np.zeros((count, words), dtype=np.uint64)
+    for position, mask in enumerate(masks):
+        for word in range(words):
+            mask_words[position, word] = (mask >> (64 * word)) & 0xFFFFFFFFFFFFFFFF
+    arrays["index.specialization_masks"] = mask_words
+
+    arrays.update(intern.arrays())
+
+    meta = {
+        'count': count,
+        'fields': field_types,
+        'specializations': names,
+        'metadata': hospitals_data.get('metadata', {}),
+        'diseaseSpecializationMapping': hospitals_data.get('diseaseSpecializationMapping', {})
+    }
+    return arrays, meta
+
+
+class RecordTable:
+    """Records stored column by column in a snapshot by encode_columns"""
+
+    def __init__(self, snapshot: Snapshot, strings: StringTable, count: int, fields: List,
+                 prefix: str = "col."):
+        self.snapshot = snapshot
+        self.strings = strings
+        self.count = count
+        self.prefix = prefix
+        self.fields: List[Tuple[str, str]] = [(field[0], field[1]) for field in fields]
+        self._field_types = dict(self.fields)
+        self._nested: Dict[str, RecordTable] = {}
+        for name, kind, *nested_fields in fields:
+            if kind == RECORD_LIST:
+                column = f"{prefix}{name}"
+                nested_count = int(snapshot.array(f"{column}.offsets")[-1])
+                self._nested[name] = RecordTable(snapshot, strings, nested_count, nested_fields[0], f"{column}/")
+
+    def float_column(self, name: str) -> np.ndarray:
+        """Numeric column as floats (NaN where missing), or all-NaN if the field is not numeric"""
+        kind = self._field_types.get(name)
+        column = f"{self.prefix}{name}"
+        if kind == INT:
+            return np.where(self.snapshot.array(f"{column}.present"), self.snapshot.array(column), np.nan)
+        if kind != FLOAT:
+            return np.full(self.count, np.nan)
+        return self.snapshot.array(column)
+
+    def value_column(self, name: str) -> List:
+        """Values of a field of any type, as JSON would give them (None where missing)"""
+        kind = self._field_types.get(name)
+        if kind is None:
+            return [None] * self.count
+        if kind == STRING:
+            return self.string_column(name)
+        column = f"{self.prefix}{name}"
+        if kind == FLOAT:
+            return [None if np.isnan(v) else v for v in self.snapshot.array(column).tolist()]
+        if kind == INT:
+            present = self.snapshot.array(f"{column}.present").tolist()
+            return [v if has else None for v, has in zip(self.snapshot.array(column).tolist(), present)]
+        if kind == JSON:
+            ids = self.snapshot.array(column)
+            decoded = {int(i): (json.loads(self.strings[int(i)]) if i >= 0 else None) for i in np.unique(ids)}
+            return [decoded[i] for i in ids.tolist()]
+        return [self.record(position).get(name) for position in range(self.count)]
+
+    def string_column(self, name: str) -> List[Optional[str]]:
+        """Decoded string column (None where missing); each distinct string is decoded once"""
+        if self._field_types.get(name) != STRING:
+            return [None] * self.count
+        ids = self.snapshot.array(f"{self.prefix}{name}")
+        unique_ids = np.unique(ids)
+        decoded = {int(i): (self.strings[int(i)] if i >= 0 else None) for i in unique_ids}
+        return [decoded[i] for i in ids.tolist()]
+
+    def record(self, position: int) -> Dict:
+        """Materialize one record as a dict"""
+        record = {}
+        for name, kind in self.fields:
+            column = f"{self.prefix}{name}"
+            if kind == FLOAT:
+                value = self.snapshot.array(column)[position]
+                if not np.isnan(value):
+                    record[name] = float(value)
+            elif kind == INT:
+                if self.snapshot.array(f"{column}.present")[position]:
+                    record[name] = int(self.snapshot.array(column)[position])
+            elif kind in (STRING_LIST, RECORD_LIST):
+                offsets = self.snapshot.array(f"{column}.offsets")
+                start, end = int(offsets[position]), int(offsets[position + 1])
+                if kind == STRING_LIST:
+                    values = self.snapshot.array(f"{column}.values")
+                    record[name] = [self.strings[int(i)] for i in values[start:end]]
+                else:
+                    nested = self._nested[name]
+                    record[name] = [nested.record(i) for i in range(start, end)]
+            else:
+                string_id = int(self.snapshot.array(column)[position])
+                if string_id >= 0:
+                    value = self.strings[string_id]
+                    record[name] = json.loads(value) if kind == JSON else value
+        return record
+
+
+class HospitalSnapshot(RecordTable):
+    """Hospital catalog read back from a snapshot"""
+
+    def __init__(self, snapshot: Snapshot):
+        if snapshot.kind != "hospitals":
+            raise SnapshotError(f"{snapshot.path} holds '{snapshot.kind}', not hospitals")
+        try:
+            strings = StringTable(snapshot.array("strings.blob"), snapshot.array("strings.offsets"))
+            super().__init__(snapshot, strings, snapshot.meta['count'], snapshot.meta['fields'])
+        except _CORRUPTION_ERRORS as e:
+            raise SnapshotError(f"Corrupt hospital snapshot {snapshot.path}: {e}")
+
+    @property
+    def metadata(self) -> Dict:
+        return self.snapshot.meta['metadata']
+
+    @property
+    def disease_mapping(self) -> Dict:
+        return self.snapshot.meta['diseaseSpecializationMapping']
+
+    def specialization_masks(self) -> List[int]:
+        """Per-hospital specialization bitmasks as Python integers"""
+        words = self.snapshot.array("index.specialization_masks")
+        masks = [0] * self.count
+        for word in range(words.shape[1]):
+            shift = 64 * word
+            masks = [m | (int(w) << shift) for m, w in zip(masks, words[:, word].tolist())]
+        return masks
+
+    def columns(self) -> HospitalColumns:
+        """Index columns for HospitalFinder, read straight from the arrays"""
+        try:
+            lats = self.float_column('lat')
+            lons = self.float_column('lon')
+            # Match from_records: zero coordinates count as missing
+            missing = np.isnan(lats) | np.isnan(lons) | (lats == 0) | (lons == 0)
+            lats = np.where(missing, np.nan, lats)
+            lons = np.where(missing, np.nan, lons)
+            # Pincodes may be numbers, strings or a mix of both; index them as text like from_records
+            pincodes = [str(p) if p else None for p in self.value_column('pincode')]
+            ratings = np.nan_to_num(self.float_column('rating'), nan=0.0)
+            return HospitalColumns(lats, lons, self.snapshot.meta['specializations'], self.specialization_masks(),
+                                   self.string_column('city'), self.string_column('state'), pincodes, ratings)
+        except _CORRUPTION_ERRORS as e:
+            raise SnapshotError(f"Corrupt hospital snapshot {self.snapshot.path}: {e}")
+
+    def records(self) -> "SnapshotRecords":
+        """Lazy sequence of every hospital; records are built only when accessed"""
+        return SnapshotRecords(self, Hospital)
+
+
+class SnapshotRecords(SequenceABC):
+    """
+    Read-only sequence of catalog records backed by a snapshot
+    Each access builds the record from the mapped columns; nothing is kept.
+    """
+
+    def __init__(self, table: RecordTable, record_type: Type[Record]):
+        self._table = table
+        self._record_type = record_type
+
+    def __len__(self) -> int:
+        return self._table.count
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._record_type.from_dict(self._table.record(position))
+                    for position in range(self._table.count)[index]]
+        if index < 0:
+            index += self._table.count
+        if not 0 <= index < self._table.count:
+            raise IndexError("record index out of range")
+        return self._record_type.from_dict(self._table.record(index))
+
+
+def load_hospital_snapshot(json_path: str) -> HospitalSnapshot:
+    """Open the snapshot that belongs to a hospital JSON catalog"""
+    return HospitalSnapshot(Snapshot(snapshot_path_for(json_path)))
+
+
+def load_diseases_snapshot(json_path: str) -> Dict:
+    """
+    Load a disease catalog from the snapshot that belongs to its JSON file
+    Diseases are built as Disease records straight from the columns, and
+    all of them are read here so a damaged file raises SnapshotError
+    before anything uses it.
+    """
+    snapshot = Snapshot(snapshot_path_for(json_path))
+    if snapshot.kind != "diseases":
+        raise SnapshotError(f"{snapshot.path} holds '{snapshot.kind}', not diseases")
+    try:
+        strings = StringTable(snapshot.array("strings.blob"), snapshot.array("strings.offsets"))
+        table = RecordTable(snapshot, strings, snapshot.meta['count'], snapshot.meta['fields'])
+        return {
+            'metadata': snapshot.meta['metadata'],
+            'diseases': list(SnapshotRecords(table, Disease))
+        }
+    except _CORRUPTION_ERRORS as e:
+        raise SnapshotError(f"Corrupt disease snapshot {snapshot.path}: {e}")
+
+
+def export_diseases(json_path: str) -> str:
+    """Compile a disease JSON catalog into its snapshot; returns the snapshot path"""
+    with open(json_path, 'r') as f:
+        diseases_data = json.load(f)
+    diseases = diseases_data.get('diseases', [])
+    intern = StringInterner()
+    arrays, field_types = encode_columns(diseases, intern)
+    arrays.update(intern.arrays())
+    meta = {'count': len(diseases), 'fields': field_types, 'metadata': diseases_data.get('metadata', {})}
+    path = snapshot_path_for(json_path)
+    write_snapshot(path, "diseases", arrays, meta)
+    return path
+
+
+def export_hospitals(json_path: str) -> str:
+    """Compile a hospital JSON catalog into its snapshot; returns the snapshot path"""
+    with open(json_path, 'r') as f:
+        hospitals_data = json.load(f)
+    arrays, meta = encode_hospitals(hospitals_data)
+    path = snapshot_path_for(json_path)
+    write_snapshot(path, "hospitals", arrays, meta)
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile catalog JSON files into binary snapshots")
+    parser.add_argument("--diseases", default="diseases.json", help="Disease catalog JSON")
+    parser.add_argument("--hospitals", default="hospitals.json", help="Hospital registry JSON")
+    args = parser.parse_args(argv)
+
+    for export, path in ((export_diseases, args.diseases), (export_hospitals, args.hospitals)):
+        print(f"Wrote {export(path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,17 @@
+import heapq
 import json
-from typing import List, Dict
+import re
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import List, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+from catalog_snapshot import SnapshotError, load_diseases_snapshot, snapshot_is_fresh
+from keyword_matcher import WordStartMatcher
+from records import Disease
+from text_normalizer import NoteTokenizer
 
 
 class AppTheme:
@@ -45,10 +57,36 @@ class AppTheme:
 
 
 
-def load_diseases_data():
-    """Load diseases data from JSON file"""
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize_symptom(symptom: str) -> List[str]:
+    """Split a lowercased symptom description into word tokens"""
+    return _TOKEN_PATTERN.findall(symptom)
+
+
+def normalize_symptom(symptom: str) -> str:
+    """Lowercase a symptom and collapse its whitespace"""
+    return " ".join(symptom.lower().split())
+
+
+def canonical_symptoms(symptoms: Iterable[str]) -> FrozenSet[str]:
+    """Order- and duplicate-insensitive form of a symptom selection"""
+    return frozenset(normalize_symptom(symptom) for symptom in symptoms)
+
+
+def load_diseases_data(path: str = 'diseases.json'):
+    """
+    Load diseases data, from the binary snapshot when it is newer than the
+    JSON file, otherwise from the JSON file
+    """
+    if snapshot_is_fresh(path):
+        try:
+            return load_diseases_snapshot(path)
+        except SnapshotError as e:
+            print(f"Disease snapshot error: {e}")
     try:
-        with open('diseases.json', 'r') as f:
+        with open(path, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
         return {
@@ -58,45 +96,289 @@ def load_diseases_data():
 
 
 class DiagnosisEngine:
-    def __init__(self, diseases_data):
+    def __init__(self, diseases_data, cache_size: int = 1024):
+        """
+        Args:
+            diseases_data: disease catalog as loaded by load_diseases_data
+            cache_size: number of symptom selections whose results are kept
+                in an LRU cache (0 disables it); see cache_info()
+        """
         self.diseases_data = diseases_data
-        self.diseases = diseases_data.get('diseases', [])
+        self.diseases: List[Disease] = [d if isinstance(d, Disease) else Disease.from_dict(d)
+                                        for d in diseases_data.get('diseases', [])]
+        self._build_symptom_index()
+        
+        self.cache_size = cache_size
+        self._result_cache: "OrderedDict[Tuple[FrozenSet[str], Optional[int]], Tuple[Dict, ...]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+    
+    def _cached_results(self, key: Tuple[FrozenSet[str], Optional[int]]) -> Optional[Tuple[Dict, ...]]:
+        """
+        Cached ranking for a canonical selection
+        The catalog never changes under an engine (a reload builds a new
+        engine), so entries never go stale.
+        """
+        if self.cache_size <= 0:
+            return None
+        with self._cache_lock:
+            results = self._result_cache.get(key)
+            if results is None:
+                self._cache_misses += 1
+                return None
+            self._result_cache.move_to_end(key)
+            self._cache_hits += 1
+            return results
+    
+    def _store_results(self, key: Tuple[FrozenSet[str], Optional[int]], results: Tuple[Dict, ...]):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._result_cache[key] = results
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self.cache_size:
+                self._result_cache.popitem(last=False)
+    
+    def cache_info(self) -> Dict[str, int]:
+        """Result cache counters: hits, misses, size and maxsize"""
+        with self._cache_lock:
+            return {
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'size': len(self._result_cache),
+                'maxsize': self.cache_size
+            }
+    
+    def clear_cache(self):
+        """Empty the result cache and reset its counters"""
+        with self._cache_lock:
+            self._result_cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+    
+    def _build_symptom_index(self):
+        """
+        Build the inverted symptom index once per catalog.
+        Maps each normalized symptom token to the positions of the diseases
+        that mention it, and caches lowercased symptoms and symptom counts.
+        """
+        index: Dict[str, Set[int]] = {}
+        self._disease_symptoms: List[List[str]] = []
+        self._symptom_counts: List[int] = []
+        # Distinct catalog symptoms, and each disease symptom's row in the incidence matrix
+        symptom_rows: Dict[str, int] = {}
+        self._disease_symptom_rows: List[List[int]] = []
+        
+        for position, disease in enumerate(self.diseases):
+            normalized = [s.symptom.lower() for s in disease.symptoms]
+            self._disease_symptoms.append(normalized)
+            self._symptom_counts.append(len(normalized))
+            self._disease_symptom_rows.append([symptom_rows.setdefault(symptom, len(symptom_rows))
+                                               for symptom in normalized])
+            for symptom in normalized:
+                for token in tokenize_symptom(symptom):
+                    index.setdefault(token, set()).add(position)
+        self._symptom_index: Dict[str, FrozenSet[int]] = {
+            token: frozenset(positions) for token, positions in index.items()
+        }
+        
+        # Catalog symptom x disease incidence matrix, used to score batches
+        self._incidence = np.zeros((len(symptom_rows), len(self.diseases)), dtype=np.float32)
+        for position, rows in enumerate(self._disease_symptom_rows):
+            self._incidence[rows, position] = 1.0
+        
+        # Diseases without symptoms never match; avoid dividing by zero when scoring batches
+        self._symptom_count_array = np.maximum(np.array(self._symptom_counts, dtype=np.float64), 1.0)
+    
+    @property
+    def symptom_index(self) -> MappingProxyType:
+        """Read-only view: symptom token -> positions of diseases mentioning it"""
+        return MappingProxyType(self._symptom_index)
+    
+    def _candidate_diseases(self, symptom_lower: str) -> Iterable[int]:
+        """Return positions of diseases that contain every token of the symptom"""
+        tokens = tokenize_symptom(symptom_lower)
+        if not tokens:
+            return range(len(self.diseases))
+        
+        postings = [self._symptom_index.get(token) for token in tokens]
+        if not all(postings):
+            return ()
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+    
+    def _resolve_symptom(self, symptom_lower: str) -> Dict[int, int]:
+        """
+        Resolve one lowercased symptom against the catalog.
+        Returns {disease position: index of first matching disease symptom}
+        """
+        resolved = {}
+        for position in self._candidate_diseases(symptom_lower):
+            for idx, disease_symptom in enumerate(self._disease_symptoms[position]):
+                if symptom_lower in disease_symptom:
+                    resolved[position] = idx
+                    break
+        return resolved
+    
+    def _build_result(self, position: int, matched: List[Dict], confidence: float) -> Dict:
+        """Build a ranked result entry for one matched disease"""
+        return {
+            'disease': self.diseases[position],
+            'matched_symptoms': matched,
+            'confidence': round(confidence, 1),
+            'match_count': len(matched)
+        }
     
-    def match_symptoms(self, selected_symptoms: List[str]) -> List[Dict]:
+    @staticmethod
+    def _copy_results(results: Tuple[Dict, ...]) -> List[Dict]:
+        """
+        Copies of cached results that callers may modify freely; the
+        records inside are read-only, so only the dicts and lists are copied
+        """
+        return [dict(result, matched_symptoms=list(result['matched_symptoms'])) for result in results]
+    
+    @staticmethod
+    def _rank(confidences: Dict[int, float], limit: Optional[int] = None) -> List[int]:
+        """
+        Disease positions by displayed (rounded) confidence, highest first,
+        ties in catalog order. With a limit only the top entries are selected,
+        using a heap instead of a full sort.
+        """
+        positions = sorted(confidences)
+        key = lambda position: -round(confidences[position], 1)
+        if limit is None:
+            return sorted(positions, key=key)
+        return heapq.nsmallest(limit, positions, key=key)
+    
+    def match_symptoms(self, selected_symptoms: List[str], limit: Optional[int] = None) -> List[Dict]:
         """
         Match selected symptoms against disease database
-        Returns list of matches with confidence scores
+        Returns list of matches with confidence scores, highest first;
+        only the best limit matches when limit is given
+        The selection is treated as a set (case, spacing, order and
+        duplicates don't matter) and matched symptoms are listed in the
+        disease's own order, so equal selections share one cached result.
+        """
+        key = (canonical_symptoms(selected_symptoms), limit)
+        results = self._cached_results(key)
+        if results is None:
+            results = self._match_canonical(key[0], limit)
+            self._store_results(key, results)
+        return self._copy_results(results)
+    
+    def _match_canonical(self, symptoms: FrozenSet[str], limit: Optional[int]) -> Tuple[Dict, ...]:
+        """Rank diseases for a canonical symptom selection"""
+        matches: Dict[int, List[int]] = {}
+        
+        for selected in symptoms:
+            for position, idx in self._resolve_symptom(selected).items():
+                matches.setdefault(position, []).append(idx)
+        
+        confidences = {
+            position: (len(matched) / self._symptom_counts[position]) * 100
+            for position, matched in matches.items()
+        }
+        return tuple(
+            self._build_result(position, [self.diseases[position].symptoms[idx] for idx in sorted(matches[position])],
+                               confidences[position])
+            for position in self._rank(confidences, limit)
+        )
+    
+    def match_symptoms_batch(self, symptom_lists: Iterable[List[str]],
+                             chunk_size: int = 1024, limit: Optional[int] = None) -> List[List[Dict]]:
+        """
+        Match many symptom lists at once
+        Returns one ranked result list per input row, identical to calling
+        match_symptoms(row, limit) on each row. Rows found in the result
+        cache are answered from it; the rest are scored in chunks with a
+        single (rows x symptoms) @ (symptoms x diseases) matrix product.
         """
-        results = []
+        columns: Dict[str, int] = {}
+        resolved: List[Dict[int, int]] = []
+        results: List[Optional[List[Dict]]] = []
         
-        for disease in self.diseases:
-            
-            disease_symptoms = [s['symptom'].lower() for s in disease['symptoms']]
-            
+        chunk: List[List[int]] = []
+        chunk_slots: List[Tuple[int, Tuple[FrozenSet[str], Optional[int]]]] = []
+        
+        def flush():
+            for (slot, key), ranked in zip(chunk_slots, self._score_chunk(chunk, resolved, limit)):
+                ranked = tuple(ranked)
+                self._store_results(key, ranked)
+                results[slot] = self._copy_results(ranked)
+        
+        for symptoms in symptom_lists:
+            key = (canonical_symptoms(symptoms), limit)
+            cached = self._cached_results(key)
+            if cached is not None:
+                results.append(self._copy_results(cached))
+                continue
             
-            matched = []
-            for selected in selected_symptoms:
-                for disease_symptom in disease['symptoms']:
-                    if selected.lower() in disease_symptom['symptom'].lower():
-                        matched.append(disease_symptom)
-                        break
+            row = []
+            for selected in key[0]:
+                column = columns.get(selected)
+                if column is None:
+                    column = columns[selected] = len(resolved)
+                    resolved.append(self._resolve_symptom(selected))
+                row.append(column)
+            chunk.append(row)
+            chunk_slots.append((len(results), key))
+            results.append(None)
             
-            if matched:
-                match_count = len(matched)
-                total_disease_symptoms = len(disease['symptoms'])
-                confidence = (match_count / total_disease_symptoms) * 100
-                
-                results.append({
-                    'disease': disease,
-                    'matched_symptoms': matched,
-                    'confidence': round(confidence, 1),
-                    'match_count': match_count
-                })
-        
-        # Sort by confidence (highest first)
-        results.sort(key=lambda x: x['confidence'], reverse=True)
+            if len(chunk) >= chunk_size:
+                flush()
+                chunk, chunk_slots = [], []
+        
+        if chunk:
+            flush()
         return results
     
+    def _catalog_rows(self, resolved: Dict[int, int]) -> List[int]:
+        """Incidence matrix rows of the catalog symptoms a resolved symptom matched"""
+        return sorted({self._disease_symptom_rows[position][idx] for position, idx in resolved.items()})
+    
+    def _score_chunk(self, rows: List[List[int]], resolved: List[Dict[int, int]],
+                     limit: Optional[int] = None) -> List[List[Dict]]:
+        """
+        Score a chunk of rows (lists of symptom columns) in one matrix product
+        Only the columns the chunk uses are looked up in the catalog's
+        incidence matrix, so a chunk costs the same however many symptoms
+        earlier chunks resolved.
+        """
+        chunk_columns = sorted({c for row in rows for c in row})
+        local = {column: i for i, column in enumerate(chunk_columns)}
+        
+        # A query symptom hits a disease when any of the catalog symptoms it matched belongs to it
+        hits = np.zeros((len(chunk_columns), len(self.diseases)), dtype=np.float32)
+        for i, column in enumerate(chunk_columns):
+            catalog_rows = self._catalog_rows(resolved[column])
+            if catalog_rows:
+                hits[i] = self._incidence[catalog_rows].max(axis=0)
+        
+        query = np.zeros((len(rows), len(chunk_columns)), dtype=np.float32)
+        row_ids = np.repeat(np.arange(len(rows)), [len(row) for row in rows])
+        column_ids = np.fromiter((local[c] for row in rows for c in row), dtype=np.intp, count=len(row_ids))
+        np.add.at(query, (row_ids, column_ids), 1.0)
+        
+        match_counts = query @ hits
+        confidences = match_counts.astype(np.float64) / self._symptom_count_array * 100
+        
+        row_confidences: List[Dict[int, float]] = [{} for _ in rows]
+        hit_rows, hit_positions = np.nonzero(match_counts)
+        hit_confidences = confidences[hit_rows, hit_positions].tolist()
+        for row_id, position, confidence in zip(hit_rows.tolist(), hit_positions.tolist(), hit_confidences):
+            row_confidences[row_id][position] = confidence
+        
+        chunk_results: List[List[Dict]] = []
+        for row, scores in zip(rows, row_confidences):
+            row_results = []
+            for position in self._rank(scores, limit):
+                symptoms = self.diseases[position].symptoms
+                matched = [symptoms[idx] for idx in sorted(resolved[c][position] for c in row if position in resolved[c])]
+                row_results.append(self._build_result(position, matched, scores[position]))
+            chunk_results.append(row_results)
+        return chunk_results
+    
     def get_urgency_color(self, urgency: str) -> str:
         """Return color based on urgency level"""
         urgency_lower = urgency.lower()
@@ -141,11 +423,36 @@ SYMPTOM_DATABASE = {
 COMMON_SYMPTOMS = list(SYMPTOM_DATABASE.keys())
 
 
+def merge_segment_symptoms(per_segment: Iterable[Iterable[str]]) -> List[str]:
+    """Combine per-segment symptom lists in order, keeping first occurrences"""
+    matched_symptoms: List[str] = []
+    for symptoms in per_segment:
+        for symptom in symptoms:
+            if symptom not in matched_symptoms:
+                matched_symptoms.append(symptom)
+    return matched_symptoms
+
+
 class SymptomExtractor:
     """Intelligent rule-based extractor with severity and negation awareness"""
     
-    def __init__(self):
-        self.symptom_db = SYMPTOM_DATABASE
+    def __init__(self, symptom_db: Optional[Dict[str, List[str]]] = None, cache_size: int = 4096,
+                 tokenizer: Optional[NoteTokenizer] = None):
+        """
+        Args:
+            symptom_db: symptom name -> keywords; defaults to SYMPTOM_DATABASE
+            cache_size: number of segments whose symptoms are kept in an LRU
+                cache (0 disables it); see cache_info()
+            tokenizer: normalizes notes and splits them into clauses and
+                tokens; defaults to NoteTokenizer()
+        """
+        self.symptom_db = symptom_db if symptom_db is not None else SYMPTOM_DATABASE
+        self.tokenizer = tokenizer or NoteTokenizer()
+        self.cache_size = cache_size
+        self._segment_cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
         
 
         self.mild_modifiers = [
@@ -158,6 +465,45 @@ class SymptomExtractor:
         ]
         
         self.negations = ["no ", "not ", "without ", "denies ", "deny ", "never ", "lack of "]
+        
+        self._compile_matcher()
+    
+    def _compile_matcher(self):
+        """
+        Compile all symptom keywords and negation/mild modifiers into a single
+        matcher so each segment is scanned once
+        Keywords are normalized like the notes they are matched against.
+        """
+        self._symptom_names = list(self.symptom_db)
+        self._keyword_owners: Dict[str, List[Tuple[int, int, str]]] = {}
+        for symptom_idx, keywords in enumerate(self.symptom_db.values()):
+            for keyword_idx, keyword in enumerate(keywords):
+                keyword = self.tokenizer.normalize(keyword)
+                self._keyword_owners.setdefault(keyword, []).append((symptom_idx, keyword_idx, keyword))
+        
+        # Pattern -> the kinds of hit it counts as (a pattern can be more than one)
+        self._pattern_kinds: Dict[str, Tuple[str, ...]] = {}
+        for kind, patterns in (('keywords', self._keyword_owners), ('negations', self.negations),
+                               ('mild', self.mild_modifiers)):
+            for pattern in patterns:
+                kinds = self._pattern_kinds.get(pattern, ())
+                if kind not in kinds:
+                    self._pattern_kinds[pattern] = kinds + (kind,)
+        self._matcher = WordStartMatcher(self._pattern_kinds)
+    
+    def _scan(self, text: str) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Scan normalized text once and group hit start positions by kind:
+        'keywords', 'negations' and 'mild', each {pattern: [starts...]}
+        Patterns only match at token starts (so 'hot' is not found in
+        'shot'), and all three kinds come from the same pass.
+        """
+        hits: Dict[str, Dict[str, List[int]]] = {'keywords': {}, 'negations': {}, 'mild': {}}
+        pattern_kinds = self._pattern_kinds
+        for start, pattern in self._matcher.find_all(text):
+            for kind in pattern_kinds[pattern]:
+                hits[kind].setdefault(pattern, []).append(start)
+        return hits
     
     def extract_symptoms(self, text: str) -> List[str]:
         """
@@ -167,71 +513,167 @@ class SymptomExtractor:
         if not text:
             return []
         
-        text_lower = text.lower().strip()
-        matched_symptoms: List[str] = []
-        
-        segments: List[str] = []
-        tmp = text_lower.replace(";", ",")
-        tmp = tmp.replace(" and ", ",")
-        for part in tmp.split(","):
-            p = part.strip()
-            if p:
-                segments.append(p)
-        if not segments:
-            segments = [text_lower]
-        
-        for segment in segments:
-            for symptom, keywords in self.symptom_db.items():
-                for keyword in keywords:
-                    if keyword in segment:
-                        if self._is_negated(segment, keyword):
-                            continue
-                        if self._is_mild_symptom(segment, keyword):
-                            continue
-                        if symptom not in matched_symptoms:
-                            matched_symptoms.append(symptom)
-                        break
-        
-        return matched_symptoms
+        return merge_segment_symptoms(self.extract_segment(segment) for segment in self.split_segments(text))
+    
+    def split_segments(self, text: str) -> List[str]:
+        """
+        Fold text and split it into the clauses that are matched
+        independently (see NoteTokenizer); spelling is corrected per
+        segment, on a cache miss
+        """
+        return self.tokenizer.clauses(text)
+    
+    def extract_segment(self, segment: str) -> Tuple[str, ...]:
+        """
+        Symptoms of one segment from split_segments, served from the LRU
+        cache when the same segment was seen recently
+        """
+        if self.cache_size <= 0:
+            return tuple(self._extract_from_segment(segment))
+        
+        with self._cache_lock:
+            symptoms = self._segment_cache.get(segment)
+            if symptoms is not None:
+                self._segment_cache.move_to_end(segment)
+                self._cache_hits += 1
+                return symptoms
+            self._cache_misses += 1
+        
+        symptoms = tuple(self._extract_from_segment(segment))
+        with self._cache_lock:
+            self._segment_cache[segment] = symptoms
+            self._segment_cache.move_to_end(segment)
+            while len(self._segment_cache) > self.cache_size:
+                self._segment_cache.popitem(last=False)
+        return symptoms
+    
+    def cache_info(self) -> Dict[str, int]:
+        """Segment cache counters: hits, misses, size and maxsize"""
+        with self._cache_lock:
+            return {
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'size': len(self._segment_cache),
+                'maxsize': self.cache_size
+            }
+    
+    def clear_cache(self):
+        """Empty the segment cache and reset its counters"""
+        with self._cache_lock:
+            self._segment_cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+    
+    def _extract_from_segment(self, segment: str) -> List[str]:
+        """Return symptoms mentioned in one segment, in symptom database order"""
+        segment = self.tokenizer.correct_spelling(segment)
+        hits = self._scan(segment)
+        keyword_hits = hits['keywords']
+        
+        candidates = sorted(
+            owner for keyword in keyword_hits for owner in self._keyword_owners[keyword]
+        )
+        
+        found: List[str] = []
+        resolved = set()
+        for symptom_idx, _, keyword in candidates:
+            if symptom_idx in resolved:
+                continue
+            pos = keyword_hits[keyword][0]
+            if self._negated_at(pos, keyword, hits):
+                continue
+            if self._mild_at(len(segment), pos, keyword, hits):
+                continue
+            resolved.add(symptom_idx)
+            found.append(self._symptom_names[symptom_idx])
+        
+        return found
+    
+    def _negated_at(self, pos: int, symptom_keyword: str, hits: Dict[str, Dict[str, List[int]]]) -> bool:
+        """Return True if a negation hit lies in the window before the keyword at pos."""
+        window_start = max(0, pos - 25)
+        window_end = pos + len(symptom_keyword)
+        for negation, starts in hits['negations'].items():
+            for start in starts:
+                if start >= window_start and start + len(negation) <= window_end:
+                    return True
+        return False
+    
+    def _mild_at(self, text_length: int, pos: int, symptom_keyword: str,
+                 hits: Dict[str, Dict[str, List[int]]]) -> bool:
+        """Return True if a mild-modifier hit lies close to the keyword at pos."""
+        mild_hits = hits['mild']
+        if not mild_hits:
+            return False
+        start = max(0, pos - 32)
+        end = min(text_length, pos + len(symptom_keyword) + 32)
+        
+        for mild, starts in mild_hits.items():
+            for mpos in starts:
+                if mpos >= start and mpos + len(mild) <= end:
+                    if abs(mpos - pos) < 22:
+                        return True
+                    break
+        
+        return False
     
     def _is_negated(self, text: str, symptom_keyword: str) -> bool:
         """Return True if a negation appears near the symptom mention."""
         pos = text.find(symptom_keyword)
         if pos == -1:
             return False
-        window = text[max(0, pos - 25):pos + len(symptom_keyword)]
-        return any(n in window for n in self.negations)
+        return self._negated_at(pos, symptom_keyword, self._scan(text))
     
     def _is_mild_symptom(self, text: str, symptom_keyword: str) -> bool:
         """Return True if the symptom appears with a mild-intensity modifier nearby."""
         pos = text.find(symptom_keyword)
         if pos == -1:
             return False
-        start = max(0, pos - 32)
-        end = min(len(text), pos + len(symptom_keyword) + 32)
-        context = text[start:end]
-        
-        for mild in self.mild_modifiers:
-            if mild in context:
-                mpos = context.find(mild)
-                kpos = context.find(symptom_keyword)
-                if abs(mpos - kpos) < 22:
-                    return True
-        
-        for sev in self.severe_modifiers:
-            if sev in context:
-                return False
-        
-        return False
+        return self._mild_at(len(text), pos, symptom_keyword, self._scan(text))
     
     def get_symptom_confidence(self, text: str, symptom: str) -> float:
         """
         Calculate confidence score for a matched symptom
         Higher score = more explicit mention
         """
-        text_lower = text.lower()
         keywords = self.symptom_db.get(symptom, [])
+        found = self._scan(self.tokenizer.normalize(text))['keywords']
         
-        count = sum(1 for keyword in keywords if keyword in text_lower)
+        count = sum(1 for keyword in keywords if self.tokenizer.normalize(keyword) in found)
         
         return min(count / len(keywords), 1.0) if keywords else 0.0
+
+
+class IncrementalSymptomExtractor:
+    """
+    Extracts symptoms from text that is edited a little at a time
+    Remembers the symptoms of each segment of the previous text and only
+    resolves segments that are new (through the extractor's shared segment
+    cache), so each keystroke costs one segment. Results are identical to
+    SymptomExtractor.extract_symptoms.
+    """
+    
+    def __init__(self, extractor: SymptomExtractor):
+        self.extractor = extractor
+        self._previous: Dict[str, Tuple[str, ...]] = {}
+        self.segments_extracted = 0
+    
+    def extract_symptoms(self, text: str) -> List[str]:
+        if not text:
+            self._previous = {}
+            return []
+        
+        current: Dict[str, Tuple[str, ...]] = {}
+        per_segment = []
+        for segment in self.extractor.split_segments(text):
+            symptoms = current.get(segment)
+            if symptoms is None:
+                symptoms = self._previous.get(segment)
+                if symptoms is None:
+                    symptoms = self.extractor.extract_segment(segment)
+                    self.segments_extracted += 1
+                current[segment] = symptoms
+            per_segment.append(symptoms)
+        
+        self._previous = current
+        return merge_segment_symptoms(per_segment)
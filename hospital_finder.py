@@ -1,21 +1,446 @@
+import heapq
 import json
-from typing import List, Dict, Tuple, Optional
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Sequence as SequenceABC
+from types import MappingProxyType
+from typing import List, Dict, Tuple, Optional, Iterable, Set, Callable, Sequence, Union
+import numpy as np
 from geopy.distance import geodesic
 import geocoder
 
+from catalog_snapshot import HospitalColumns, SnapshotError, load_hospital_snapshot, snapshot_is_fresh
+from records import Hospital
+
+
+EARTH_RADIUS_KM = 6371.0088
+# Polar radius: the smallest radius gives the widest angular search window
+_MIN_EARTH_RADIUS_KM = 6356.752
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometers on a spherical Earth"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_km_array(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Vectorized great-circle distances in kilometers from one point to many"""
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlambda = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialGrid:
+    """
+    Fixed-size latitude/longitude grid over hospital positions
+    Radius and k-nearest lookups return a superset of the true answer from
+    nearby cells only; callers compute exact distances for that shortlist.
+    """
+    
+    # Give up on ring expansion and fall back to every point beyond this many rings
+    MAX_RINGS = 64
+    
+    def __init__(self, points: Iterable[Tuple[int, float, float]], cell_size_deg: float = 0.25):
+        self.cell_size = cell_size_deg
+        self.lon_cells = int(math.ceil(360.0 / cell_size_deg))
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.coords: Dict[int, Tuple[float, float]] = {}
+        
+        for position, lat, lon in points:
+            self.coords[position] = (lat, lon)
+            self.cells.setdefault(self._cell(lat, lon), []).append(position)
+    
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / self.cell_size)),
+                int(math.floor((lon + 180.0) / self.cell_size)) % self.lon_cells)
+    
+    def within(self, lat: float, lon: float, radius_km: float) -> Set[int]:
+        """Return positions of every point that may lie within radius_km"""
+        # Angular radius with a 1% margin for the ellipsoid vs. sphere difference
+        delta = math.degrees(radius_km * 1.01 / _MIN_EARTH_RADIUS_KM)
+        min_lat, max_lat = lat - delta, lat + delta
+        
+        if min_lat <= -90.0 or max_lat >= 90.0 or delta >= 90.0:
+            lon_range = range(self.lon_cells)
+        else:
+            dlon = math.degrees(math.asin(min(1.0, math.sin(math.radians(delta)) / math.cos(math.radians(lat)))))
+            first = int(math.floor((lon - dlon + 180.0) / self.cell_size))
+            last = int(math.floor((lon + dlon + 180.0) / self.cell_size))
+            if last - first + 1 >= self.lon_cells:
+                lon_range = range(self.lon_cells)
+            else:
+                lon_range = [c % self.lon_cells for c in range(first, last + 1)]
+        
+        found: Set[int] = set()
+        for lat_cell in range(int(math.floor(min_lat / self.cell_size)), int(math.floor(max_lat / self.cell_size)) + 1):
+            for lon_cell in lon_range:
+                bucket = self.cells.get((lat_cell, lon_cell))
+                if bucket:
+                    found.update(bucket)
+        return found
+    
+    def nearest(self, lat: float, lon: float, k: int, allowed: Optional[Set[int]] = None) -> Set[int]:
+        """
+        Return positions of a candidate set that contains the k nearest points
+        (restricted to allowed positions when given)
+        """
+        eligible = len(self.coords) if allowed is None else len(allowed & self.coords.keys())
+        if k <= 0 or eligible == 0:
+            return set()
+        
+        center_lat, center_lon = self._cell(lat, lon)
+        found: Set[int] = set()
+        ring = 0
+        while len(found) < min(k, eligible):
+            if ring > self.MAX_RINGS:
+                found = {p for p in self.coords if allowed is None or p in allowed}
+                break
+            for lat_cell in range(center_lat - ring, center_lat + ring + 1):
+                on_edge = abs(lat_cell - center_lat) == ring
+                lon_offsets = range(-ring, ring + 1) if on_edge else (-ring, ring)
+                for offset in set(lon_offsets):
+                    bucket = self.cells.get((lat_cell, (center_lon + offset) % self.lon_cells), ())
+                    found.update(p for p in bucket if allowed is None or p in allowed)
+            ring += 1
+        
+        # Anything closer than the k-th candidate found so far lies within that radius
+        distances = sorted(haversine_km(lat, lon, *self.coords[p]) for p in found)
+        radius = distances[min(k, len(distances)) - 1]
+        candidates = self.within(lat, lon, radius * 1.01 + 1e-6)
+        return candidates if allowed is None else candidates & allowed
+
+
+class HospitalResults(SequenceABC):
+    """
+    Ranked search results that build each Hospital record (with distance_km
+    and travel_time) only when it is accessed, so ranking thousands of
+    hospitals costs no more memory than the rows actually displayed
+    """
+    
+    def __init__(self, finder: "HospitalFinder", positions: List[int], distances: Dict[int, float],
+                 total: Optional[int] = None):
+        self._finder = finder
+        self._positions = positions
+        self._distances = distances
+        # Number of hospitals that matched before a limit was applied
+        self.total = len(positions) if total is None else total
+    
+    def __len__(self) -> int:
+        return len(self._positions)
+    
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._finder._result_for(p, self._distances.get(p)) for p in self._positions[index]]
+        position = self._positions[index]
+        return self._finder._result_for(position, self._distances.get(position))
+    
+    @property
+    def positions(self) -> List[int]:
+        """Registry positions of the results, in ranked order"""
+        return list(self._positions)
+
+
+class HeapHospitalResults(HospitalResults):
+    """
+    Results ranked on demand: candidates wait in a heap of (sort key,
+    position) and are popped into the ranking only as far as they are
+    read, so reading the first pages costs a heapify plus a few pops
+    instead of a full sort. Equal keys keep registry order.
+    """
+    
+    def __init__(self, finder: "HospitalFinder", candidates: List[Tuple[float, int]], distances: Dict[int, float]):
+        super().__init__(finder, [], distances, len(candidates))
+        heapq.heapify(candidates)
+        self._heap = candidates
+    
+    def _rank_until(self, count: int):
+        while len(self._positions) < count and self._heap:
+            self._positions.append(heapq.heappop(self._heap)[1])
+    
+    def __len__(self) -> int:
+        return self.total
+    
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            indices = range(*index.indices(self.total))
+            self._rank_until(max(indices) + 1 if indices else 0)
+            return [self._finder._result_for(p, self._distances.get(p)) for p in
+                    (self._positions[i] for i in indices)]
+        if index < 0:
+            index += self.total
+        if not 0 <= index < self.total:
+            raise IndexError("hospital index out of range")
+        self._rank_until(index + 1)
+        return super().__getitem__(index)
+    
+    @property
+    def positions(self) -> List[int]:
+        self._rank_until(self.total)
+        return list(self._positions)
+
+
+class HospitalList(list):
+    """List of hospital records that also carries the match count before a limit was applied"""
+    
+    def __init__(self, hospitals: Iterable[Hospital] = (), total: Optional[int] = None):
+        super().__init__(hospitals)
+        self.total = len(self) if total is None else total
+
+
+class HospitalCursor:
+    """
+    Position in one ranked hospital search, read page by page
+    Each page builds records only for its own rows; with HeapHospitalResults
+    the ranking itself is also extended one page at a time.
+    """
+    
+    def __init__(self, results: HospitalResults, page_size: int = 10, offset: int = 0):
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        self._results = results
+        self.page_size = page_size
+        self.offset = offset
+    
+    @property
+    def total(self) -> int:
+        """Number of hospitals in the whole ranking"""
+        return self._results.total
+    
+    @property
+    def has_more(self) -> bool:
+        return self.offset < len(self._results)
+    
+    def next_page(self) -> List[Hospital]:
+        """Return the next page of hospitals (empty when exhausted) and advance"""
+        hospitals = self._results[self.offset:self.offset + self.page_size]
+        self.offset += len(hospitals)
+        return hospitals
+
+
+Location = Tuple[float, float, str]
+
+
+class LocationProvider(ABC):
+    """
+    Source of the user's approximate location as (lat, lon, city)
+    locate() usually runs on a background thread, so a subclass that does
+    not implement it fails when it is instantiated instead.
+    """
+    
+    @abstractmethod
+    def locate(self) -> Optional[Location]:
+        """The location, or None if it cannot be determined"""
+
+
+class IPLocationProvider(LocationProvider):
+    """IP-based geolocation through geocoder"""
+    
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+    
+    def locate(self) -> Optional[Location]:
+        g = geocoder.ip('me', timeout=self.timeout)
+        if g.ok:
+            return (g.latlng[0], g.latlng[1], g.city if g.city else "Unknown")
+        return None
+
+
+class StaticLocationProvider(LocationProvider):
+    """Fixed location, for offline use and tests"""
+    
+    def __init__(self, location: Optional[Location]):
+        self.location = location
+    
+    def locate(self) -> Optional[Location]:
+        return self.location
+
+
+class CachedLocationProvider(LocationProvider):
+    """
+    Wraps another provider and keeps its last answer on disk for ttl_seconds
+    so repeat visits don't hit the network
+    """
+    
+    DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".waterwise", "location.json")
+    
+    def __init__(self, provider: LocationProvider, cache_path: Optional[str] = None,
+                 ttl_seconds: float = 6 * 3600):
+        self.provider = provider
+        self.cache_path = cache_path or self.DEFAULT_CACHE_PATH
+        self.ttl_seconds = ttl_seconds
+    
+    def cached(self) -> Optional[Location]:
+        """Return the cached location if it is still fresh, without any network access"""
+        try:
+            with open(self.cache_path, 'r') as f:
+                entry = json.load(f)
+            if time.time() - entry['timestamp'] <= self.ttl_seconds:
+                return (entry['lat'], entry['lon'], entry['city'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+    
+    def store(self, location: Location):
+        """Write a resolved location to the cache file"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'lat': location[0], 'lon': location[1], 'city': location[2],
+                           'timestamp': time.time()}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Location cache error: {e}")
+    
+    def locate(self) -> Optional[Location]:
+        location = self.cached()
+        if location is None:
+            location = self.provider.locate()
+            if location is not None:
+                self.store(location)
+        return location
+
 
 class HospitalFinder:
     """Rule-based hospital finder with location detection and filtering"""
     
-    def __init__(self):
-        self.hospitals_data = self.load_hospitals()
-        self.hospitals = self.hospitals_data.get('hospitals', [])
+    DISTANCE_MODES = ("geodesic", "haversine")
+    
+    def __init__(self, distance_mode: str = "geodesic", refine_top_k: Optional[int] = None,
+                 location_provider: Optional[LocationProvider] = None, data_path: str = 'hospitals.json'):
+        """
+        Args:
+            distance_mode: 'geodesic' computes exact ellipsoidal distances one
+                hospital at a time; 'haversine' computes spherical distances
+                for all candidates in one NumPy operation
+            refine_top_k: in haversine mode, recompute the k nearest
+                candidates with exact geodesic distance
+            location_provider: source for get_user_location; defaults to
+                IP geolocation cached on disk
+            data_path: hospital registry JSON file
+        """
+        if distance_mode not in self.DISTANCE_MODES:
+            raise ValueError(f"distance_mode must be one of {self.DISTANCE_MODES}")
+        self.distance_mode = distance_mode
+        self.refine_top_k = refine_top_k
+        self.location_provider = location_provider or CachedLocationProvider(IPLocationProvider())
+        self.data_path = data_path
+        
+        self.hospitals_data, columns = self._load_catalog()
+        self.hospitals: Sequence[Hospital] = self.hospitals_data.get('hospitals', [])
         self.disease_mapping = self.hospitals_data.get('diseaseSpecializationMapping', {})
+        self._build_indexes(columns)
+    
+    def _load_catalog(self) -> Tuple[Dict, Optional[HospitalColumns]]:
+        """
+        Load the registry from its binary snapshot when that is newer than the
+        JSON file, otherwise from JSON
+        A snapshot is memory-mapped: hospitals becomes a lazy sequence whose
+        records are built on access, and the index columns are read from it.
+        JSON entries are converted to Hospital records once, here.
+        """
+        if snapshot_is_fresh(self.data_path):
+            try:
+                snapshot = load_hospital_snapshot(self.data_path)
+                hospitals_data = {
+                    'metadata': snapshot.metadata,
+                    'diseaseSpecializationMapping': snapshot.disease_mapping,
+                    'hospitals': snapshot.records()
+                }
+                return hospitals_data, snapshot.columns()
+            except SnapshotError as e:
+                print(f"Hospital snapshot error: {e}")
+        hospitals_data = self.load_hospitals()
+        hospitals_data['hospitals'] = [Hospital.from_dict(h) for h in hospitals_data.get('hospitals', [])]
+        return hospitals_data, None
+    
+    def _build_indexes(self, columns: Optional[HospitalColumns] = None):
+        """Build all lookup structures from index columns (derived from self.hospitals if not given)"""
+        if columns is None:
+            columns = HospitalColumns.from_records(self.hospitals)
+        self._build_spatial_index(columns)
+        self._build_specialization_index(columns)
+        self._build_location_index(columns)
+        self._ratings = columns.ratings.tolist()
+    
+    def _build_location_index(self, columns: HospitalColumns):
+        """Index hospital positions by lowercased city and state, and by pincode"""
+        self._city_index: Dict[str, Tuple[int, ...]] = {}
+        self._state_index: Dict[str, Tuple[int, ...]] = {}
+        self._pincode_index: Dict[str, Tuple[int, ...]] = {}
+        cities = set()
+        
+        for position, (city, state, pincode) in enumerate(zip(columns.cities, columns.states, columns.pincodes)):
+            city = city or ''
+            self._city_index.setdefault(city.lower(), []).append(position)
+            if city:
+                cities.add(city)
+            self._state_index.setdefault((state or '').lower(), []).append(position)
+            if pincode:
+                self._pincode_index.setdefault(pincode.strip(), []).append(position)
+        
+        for index in (self._city_index, self._state_index, self._pincode_index):
+            for key, positions in index.items():
+                index[key] = tuple(positions)
+        self._cities = sorted(cities)
+    
+    @property
+    def city_index(self) -> MappingProxyType:
+        """Read-only view: lowercased city -> hospital positions"""
+        return MappingProxyType(self._city_index)
+    
+    @property
+    def state_index(self) -> MappingProxyType:
+        """Read-only view: lowercased state -> hospital positions"""
+        return MappingProxyType(self._state_index)
+    
+    @property
+    def pincode_index(self) -> MappingProxyType:
+        """Read-only view: pincode -> hospital positions"""
+        return MappingProxyType(self._pincode_index)
+    
+    @property
+    def specialization_bits(self) -> MappingProxyType:
+        """Read-only view: lowercased specialization -> bit in the hospital masks"""
+        return MappingProxyType(self._specialization_bits)
+    
+    def _build_specialization_index(self, columns: HospitalColumns):
+        """
+        Specializations interned into bit positions, with each hospital's
+        specializations stored as one integer bitmask
+        """
+        self._specialization_bits: Dict[str, int] = {
+            name: bit for bit, name in enumerate(columns.specialization_names)
+        }
+        self._specialization_masks: List[int] = columns.specialization_masks
+        
+        # Requested specialization mask -> (sorted positions, position set)
+        self._specialization_postings: Dict[int, Tuple[List[int], Set[int]]] = {}
+    
+    def _build_spatial_index(self, columns: HospitalColumns):
+        """Index hospitals that have coordinates on a lat/lon grid and keep coordinate arrays"""
+        self._lats = columns.lats
+        self._lons = columns.lons
+        self._has_coords = (~np.isnan(self._lats)).tolist()
+        with_coords = np.flatnonzero(self._has_coords)
+        self._spatial_index = SpatialGrid(
+            zip(with_coords.tolist(), self._lats[with_coords].tolist(), self._lons[with_coords].tolist())
+        )
     
     def load_hospitals(self) -> Dict:
         """Load hospital data from JSON"""
         try:
-            with open('hospitals.json', 'r') as f:
+            with open(self.data_path, 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
             return {
@@ -25,17 +450,51 @@ class HospitalFinder:
     
     def get_user_location(self) -> Optional[Tuple[float, float, str]]:
         """
-        Get user's current location using IP-based geolocation
+        Get user's current location from the location provider
+        (IP-based geolocation by default). Blocks until it answers.
         Returns (lat, lon, city) or None
         """
         try:
-            g = geocoder.ip('me')
-            if g.ok:
-                return (g.latlng[0], g.latlng[1], g.city if g.city else "Unknown")
+            return self.location_provider.locate()
         except Exception as e:
             print(f"Location detection error: {e}")
         return None
     
+    def get_cached_user_location(self) -> Optional[Tuple[float, float, str]]:
+        """Return a cached location without blocking, or None if there is none"""
+        cached = getattr(self.location_provider, 'cached', None)
+        return cached() if cached else None
+    
+    def get_user_location_async(self, callback: Callable[[Optional[Location]], None],
+                                timeout: float = 5.0) -> threading.Thread:
+        """
+        Resolve the user's location on a background thread
+        callback is called exactly once: with the location, or with None if
+        the lookup fails or takes longer than timeout seconds
+        """
+        lock = threading.Lock()
+        delivered = []
+        
+        def deliver(location):
+            with lock:
+                if delivered:
+                    return
+                delivered.append(True)
+            callback(location)
+        
+        timer = threading.Timer(timeout, deliver, args=(None,))
+        timer.daemon = True
+        
+        def worker():
+            location = self.get_user_location()
+            timer.cancel()
+            deliver(location)
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        timer.start()
+        thread.start()
+        return thread
+    
     def get_specializations_for_disease(self, disease_name: str) -> List[str]:
         """Get relevant medical specializations for a disease"""
         return self.disease_mapping.get(disease_name, ["General Medicine"])
@@ -51,6 +510,38 @@ class HospitalFinder:
             print(f"Distance calculation error: {e}")
             return float('inf')
     
+    def _coords_of(self, position: int) -> Tuple[float, float]:
+        return (float(self._lats[position]), float(self._lons[position]))
+    
+    def _result_for(self, position: int, distance: Optional[float]) -> Hospital:
+        """Copy of a hospital record with distance_km and travel_time set"""
+        if distance is None:
+            return self.hospitals[position].replace(distance_km=None, travel_time=None)
+        return self.hospitals[position].replace(distance_km=round(distance, 2),
+                                                travel_time=self.calculate_travel_time(distance))
+    
+    def _distances_for(self, user_coords: Tuple[float, float], positions: Iterable[int]) -> Dict[int, float]:
+        """
+        Distances in kilometers from the user to every hospital (by position)
+        that has coordinates, using the configured distance mode
+        """
+        coord_positions = [p for p in positions if self._has_coords[p]]
+        if self.distance_mode == "geodesic":
+            return {p: self.calculate_distance(user_coords, self._coords_of(p)) for p in coord_positions}
+        
+        if not coord_positions:
+            return {}
+        index = np.array(coord_positions, dtype=np.intp)
+        distances = haversine_km_array(user_coords[0], user_coords[1], self._lats[index], self._lons[index])
+        
+        if self.refine_top_k:
+            k = min(self.refine_top_k, len(coord_positions))
+            for i in np.argpartition(distances, k - 1)[:k].tolist():
+                p = coord_positions[i]
+                distances[i] = self.calculate_distance(user_coords, self._coords_of(p))
+        
+        return dict(zip(coord_positions, distances.tolist()))
+    
     def calculate_travel_time(self, distance_km: float, avg_speed_kmh: float = 30.0) -> str:
         """
         Calculate estimated travel time based on distance
@@ -73,19 +564,62 @@ class HospitalFinder:
             else:
                 return f"{hours} hr"
     
-    def filter_hospitals_by_city(self, city: str) -> List[Dict]:
+    def _filter_positions_by_city(self, city: str) -> List[int]:
+        """Positions of hospitals in a city, or of all hospitals if none match"""
+        if not city:
+            return list(range(len(self.hospitals)))
+        
+        filtered = self._city_index.get(city.lower().strip())
+        
+        return list(filtered) if filtered else list(range(len(self.hospitals)))
+    
+    def filter_hospitals_by_city(self, city: str) -> Sequence[Hospital]:
         """Filter hospitals by city name"""
         if not city:
             return self.hospitals
         
-        city_lower = city.lower().strip()
-        filtered = []
+        return [self.hospitals[position] for position in self._filter_positions_by_city(city)]
+    
+    def filter_hospitals_by_state(self, state: str) -> List[Hospital]:
+        """Filter hospitals by state name (empty list if none match)"""
+        positions = self._state_index.get(state.lower().strip(), ()) if state else ()
+        return [self.hospitals[position] for position in positions]
+    
+    def filter_hospitals_by_pincode(self, pincode: str) -> List[Hospital]:
+        """Filter hospitals by pincode (empty list if none match)"""
+        positions = self._pincode_index.get(str(pincode).strip(), ()) if pincode else ()
+        return [self.hospitals[position] for position in positions]
+    
+    def _specialization_mask(self, specializations: List[str]) -> int:
+        """Bitmask for a list of specialization names (unknown names are ignored)"""
+        mask = 0
+        for spec in specializations:
+            bit = self._specialization_bits.get(spec.lower())
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+    
+    def _positions_with_specializations(self, mask: int) -> Tuple[List[int], Set[int]]:
+        """Positions of hospitals sharing any bit with mask, computed once per mask"""
+        postings = self._specialization_postings.get(mask)
+        if postings is None:
+            matching = [p for p, hospital_mask in enumerate(self._specialization_masks) if hospital_mask & mask]
+            postings = self._specialization_postings[mask] = (matching, set(matching))
+        return postings
+    
+    def _filter_positions_by_specialization(self, positions: List[int],
+                                            specializations: List[str]) -> List[int]:
+        """Positions with a matching specialization, or all given positions if none match"""
+        if not specializations:
+            return positions
         
-        for hospital in self.hospitals:
-            if hospital.get('city', '').lower() == city_lower:
-                filtered.append(hospital)
+        matching, matching_set = self._positions_with_specializations(self._specialization_mask(specializations))
+        if len(positions) == len(self.hospitals):
+            filtered = list(matching)
+        else:
+            filtered = [p for p in positions if p in matching_set]
         
-        return filtered if filtered else self.hospitals
+        return filtered if filtered else positions
     
     def filter_hospitals_by_specialization(self, hospitals: List[Dict], 
                                           specializations: List[str]) -> List[Dict]:
@@ -110,9 +644,24 @@ class HospitalFinder:
                             user_coords: Optional[Tuple[float, float]] = None,
                             city: Optional[str] = None,
                             max_distance: float = 50.0,
-                            sort_by: str = "distance") -> List[Dict]:
+                            sort_by: str = "distance",
+                            limit: Optional[int] = None) -> HospitalList:
         """
         Main function to find nearby hospitals for a disease
+        Returns a list of hospitals with distance info; its total attribute
+        is the number of matches before limit was applied. Arguments are
+        those of rank_nearby_hospitals.
+        """
+        results = self.rank_nearby_hospitals(disease_name, user_coords, city, max_distance, sort_by, limit)
+        return HospitalList(results, results.total)
+    
+    def rank_nearby_hospitals(self, disease_name: str, user_coords: Optional[Tuple[float, float]] = None,
+                              city: Optional[str] = None, max_distance: float = 50.0,
+                              sort_by: str = "distance", limit: Optional[int] = None) -> HospitalResults:
+        """
+        Same search as find_nearby_hospitals, returned as lazy results
+        Ranking uses the index columns only; hospital records are built
+        when they are read.
         
         Args:
             disease_name: Detected disease name
@@ -120,49 +669,99 @@ class HospitalFinder:
             city: City name for filtering
             max_distance: Maximum distance in km (only applied if city matches user's city)
             sort_by: 'distance' or 'rating'
+            limit: return only the first limit hospitals of the ranking,
+                selected with a heap instead of a full sort; the full match
+                count is still available as results.total
         
         Returns:
-            List of hospitals with distance info
+            Sequence of hospitals with distance info; hospitals without
+            coordinates sort after the rest when sorting by distance
         """
+        positions, distances = self._nearby_candidates(disease_name, user_coords, city, max_distance)
+        total = len(positions)
+        key = self._rank_key(sort_by, user_coords, distances)
+        if key is not None:
+            if limit is None:
+                positions.sort(key=key)
+            else:
+                positions = heapq.nsmallest(limit, positions, key=key)
+        
+        if limit is not None:
+            positions = positions[:max(limit, 0)]
+        return HospitalResults(self, positions, distances, total)
+    
+    def _nearby_candidates(self, disease_name: str, user_coords: Optional[Tuple[float, float]],
+                           city: Optional[str], max_distance: float) -> Tuple[List[int], Dict[int, float]]:
+        """Positions (in registry order) and distances of every hospital that passes the search filters"""
         required_specs = self.get_specializations_for_disease(disease_name)
         
         
-        apply_distance_filter = False
-        if city:
-            hospitals = self.filter_hospitals_by_city(city)
-        else:
-            hospitals = self.hospitals.copy()
-            apply_distance_filter = True 
+        apply_distance_filter = not city
+        positions = self._filter_positions_by_city(city)
+        positions = self._filter_positions_by_specialization(positions, required_specs)
         
-        hospitals = self.filter_hospitals_by_specialization(hospitals, required_specs)
+        if apply_distance_filter and user_coords:
+            # Only hospitals in nearby grid cells can pass the distance filter;
+            # hospitals without coordinates are kept, as they get no distance
+            nearby = self._spatial_index.within(user_coords[0], user_coords[1], max_distance)
+            positions = [p for p in positions if p in nearby or not self._has_coords[p]]
         
-        results = []
-        for hospital in hospitals:
-            hospital_coords = (hospital.get('lat'), hospital.get('lon'))
-            
-            result = hospital.copy()
-            
-            if user_coords and hospital_coords[0] and hospital_coords[1]:
-                distance = self.calculate_distance(user_coords, hospital_coords)
-                result['distance_km'] = round(distance, 2)
-                result['travel_time'] = self.calculate_travel_time(distance)
-                
-
-                if apply_distance_filter and distance > max_distance:
-                    continue
-            else:
-                result['distance_km'] = None
-                result['travel_time'] = None
-            
-            results.append(result)
-                
+        distances = self._distances_for(user_coords, positions) if user_coords else {}
         
+        if apply_distance_filter:
+            positions = [p for p in positions if distances.get(p) is None or distances[p] <= max_distance]
+        return positions, distances
+    
+    def _rank_key(self, sort_by: str, user_coords: Optional[Tuple[float, float]],
+                  distances: Dict[int, float]) -> Optional[Callable[[int], float]]:
+        """
+        Ascending sort key for a ranking, or None to keep registry order
+        Distance sorts on the displayed (rounded) distance so ties keep
+        registry order, with hospitals without coordinates last.
+        """
         if sort_by == "distance" and user_coords:
-            results.sort(key=lambda x: x.get('distance_km', float('inf')))
-        elif sort_by == "rating":
-            results.sort(key=lambda x: x.get('rating', 0), reverse=True)
+            unknown = float('inf')
+            return lambda p: round(distances[p], 2) if p in distances else unknown
+        if sort_by == "rating":
+            ratings = self._ratings
+            return lambda p: -ratings[p]
+        return None
+    
+    def find_nearby_hospitals_paged(self, disease_name: str,
+                                    user_coords: Optional[Tuple[float, float]] = None,
+                                    city: Optional[str] = None, max_distance: float = 50.0,
+                                    sort_by: str = "distance", page_size: int = 10) -> HospitalCursor:
+        """
+        Same search as find_nearby_hospitals, returned as a cursor that hands
+        out page_size hospitals at a time
+        Hospitals are ranked from a heap as pages are read rather than fully
+        sorted up front.
+        """
+        positions, distances = self._nearby_candidates(disease_name, user_coords, city, max_distance)
+        key = self._rank_key(sort_by, user_coords, distances)
+        if key is None:
+            results = HospitalResults(self, positions, distances)
+        else:
+            results = HeapHospitalResults(self, [(key(p), p) for p in positions], distances)
+        return HospitalCursor(results, page_size)
+    
+    def find_nearest_hospitals(self, user_coords: Tuple[float, float], k: int = 5,
+                               disease_name: Optional[str] = None) -> List[Hospital]:
+        """
+        Find the k hospitals closest to the user, optionally restricted to
+        the specializations relevant for a disease
+        Only hospitals in nearby grid cells get a distance computed.
+        """
+        allowed = None
+        if disease_name:
+            required_specs = self.get_specializations_for_disease(disease_name)
+            allowed = set(self._filter_positions_by_specialization(list(range(len(self.hospitals))), required_specs))
+        
+        candidates = self._spatial_index.nearest(user_coords[0], user_coords[1], k, allowed)
         
-        return results
+        ranked = sorted((distance, p) for p, distance in self._distances_for(user_coords, candidates).items())
+        
+        return [self._result_for(position, distance) for distance, position in ranked[:k]]
     
     def get_directions_url(self, hospital: Dict, user_coords: Optional[Tuple[float, float]] = None) -> str:
         """
@@ -189,9 +788,4 @@ class HospitalFinder:
     
     def get_cities_list(self) -> List[str]:
         """Get unique list of cities from hospital database"""
-        cities = set()
-        for hospital in self.hospitals:
-            city = hospital.get('city')
-            if city:
-                cities.add(city)
-        return sorted(list(cities))
+        return list(self._cities)
@@ -0,0 +1,324 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import flet as ft
+
+
+# Set to a file path to enable route metrics; they are dumped there as JSON
+METRICS_PATH_ENV = "WATERWISE_METRICS"
+METRICS_INTERVAL_ENV = "WATERWISE_METRICS_INTERVAL"
+
+TIME_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+SIZE_BOUNDS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BOUNDS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def bounds_for(metric: str) -> Sequence[float]:
+    """Histogram bucket bounds chosen by the metric's unit suffix"""
+    if metric.endswith("_ms"):
+        return TIME_BOUNDS_MS
+    if metric.endswith("_bytes"):
+        return SIZE_BOUNDS_BYTES
+    return COUNT_BOUNDS
+
+
+class RollingHistogram:
+    """Bucketed histogram and percentiles over the most recent window of samples"""
+
+    def __init__(self, bounds: Sequence[float], window: int = 1024):
+        self.bounds = tuple(bounds)
+        self.samples = deque(maxlen=window)
+        self.total_count = 0
+
+    def add(self, value: float):
+        self.samples.append(value)
+        self.total_count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        values = sorted(self.samples)
+        buckets = [0] * (len(self.bounds) + 1)
+        for value in values:
+            buckets[bisect.bisect_left(self.bounds, value)] += 1
+
+        def percentile(p: float) -> Optional[float]:
+            if not values:
+                return None
+            return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+        labels = [f"le_{bound:g}" for bound in self.bounds] + ["le_inf"]
+        return {
+            'count': len(values),
+            'total_count': self.total_count,
+            'mean': sum(values) / len(values) if values else None,
+            'p50': percentile(50),
+            'p90': percentile(90),
+            'p99': percentile(99),
+            'max': values[-1] if values else None,
+            'buckets': dict(zip(labels, buckets))
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe per-route rolling histograms shared by all sessions
+    Metric names end in _ms (milliseconds), _bytes, or are plain counts.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._histograms: Dict[str, Dict[str, RollingHistogram]] = {}
+        self._lock = threading.Lock()
+        self._dumper: Optional[threading.Thread] = None
+        self._stop_dumping = threading.Event()
+
+    def record(self, route: Optional[str], metric: str, value: float):
+        route = route or "unknown"
+        with self._lock:
+            metrics = self._histograms.setdefault(route, {})
+            histogram = metrics.get(metric)
+            if histogram is None:
+                histogram = metrics[metric] = RollingHistogram(bounds_for(metric), self.window)
+            histogram.add(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All histograms as a JSON-compatible dict"""
+        with self._lock:
+            routes = {
+                route: {metric: histogram.summary() for metric, histogram in sorted(metrics.items())}
+                for route, metrics in sorted(self._histograms.items())
+            }
+        return {'generated_at': time.time(), 'window': self.window, 'routes': routes}
+
+    def dump(self, path: str):
+        """Write the snapshot to path atomically, so scrapers never read a partial file"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def start_dumping(self, path: str, interval: float = 60.0):
+        """Dump to path every interval seconds on a daemon thread"""
+        if self._dumper is not None:
+            return
+        self._stop_dumping.clear()
+
+        def run():
+            while not self._stop_dumping.wait(interval):
+                try:
+                    self.dump(path)
+                except OSError as e:
+                    print(f"Metrics dump error: {e}")
+
+        self._dumper = threading.Thread(target=run, name="metrics-dumper", daemon=True)
+        self._dumper.start()
+
+    def stop_dumping(self):
+        self._stop_dumping.set()
+        if self._dumper is not None:
+            self._dumper.join()
+            self._dumper = None
+
+
+def count_controls(control: ft.Control) -> int:
+    """Number of controls in a tree, including the root"""
+    count = 1
+    for child in control._get_children():
+        if isinstance(child, ft.Control):
+            count += count_controls(child)
+    return count
+
+
+class TimedProxy:
+    """
+    Wraps a service so each method call is timed and recorded against the
+    session's current route as '<label>.<method>_ms'
+    For '*_async' methods the time until the callback (first callable
+    argument) fires is recorded instead, e.g. background geolocation.
+    """
+
+    def __init__(self, target: Any, label: str, instrumentation: "RouteInstrumentation"):
+        self._target = target
+        self._label = label
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name: str):
+        value = getattr(self._target, name)
+        if not callable(value):
+            return value
+        metric = f"{self._label}.{name}_ms"
+        record = self._instrumentation.record
+
+        if name.endswith("_async"):
+            def call_async(*args, **kwargs):
+                start = time.perf_counter()
+                args = list(args)
+                for i, arg in enumerate(args):
+                    if callable(arg):
+                        callback = arg
+
+                        def timed_callback(*cb_args, **cb_kwargs):
+                            record(metric, (time.perf_counter() - start) * 1000)
+                            return callback(*cb_args, **cb_kwargs)
+
+                        args[i] = timed_callback
+                        break
+                return value(*args, **kwargs)
+            return call_async
+
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return value(*args, **kwargs)
+            finally:
+                record(metric, (time.perf_counter() - start) * 1000)
+        return call
+
+
+class ConnectionHook:
+    """
+    Wraps a connection's send_commands once and records the serialized size
+    of each command batch against the session that sent it
+    In web mode one connection serves every session, so sessions register
+    here instead of wrapping the connection themselves, and unregister when
+    they close.
+    """
+
+    # Set on a connection once it is hooked
+    ATTRIBUTE = "_waterwise_metrics_hook"
+    _install_lock = threading.Lock()
+
+    def __init__(self, connection: Any, encoder: type):
+        self._send_commands = connection.send_commands
+        self._encoder = encoder
+        self._sessions: Dict[Any, "RouteInstrumentation"] = {}
+        connection.send_commands = self.send_commands
+
+    @classmethod
+    def install(cls, connection: Any, encoder: type) -> "ConnectionHook":
+        """The connection's hook, wrapping send_commands on first use"""
+        with cls._install_lock:
+            hook = getattr(connection, cls.ATTRIBUTE, None)
+            if hook is None:
+                hook = cls(connection, encoder)
+                setattr(connection, cls.ATTRIBUTE, hook)
+            return hook
+
+    @property
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+    def register(self, session_id: Any, instrumentation: "RouteInstrumentation"):
+        self._sessions[session_id] = instrumentation
+
+    def unregister(self, session_id: Any):
+        self._sessions.pop(session_id, None)
+
+    def send_commands(self, session_id, commands):
+        instrumentation = self._sessions.get(session_id)
+        if instrumentation is not None:
+            try:
+                size = len(json.dumps(commands, cls=self._encoder, separators=(",", ":")))
+                instrumentation.record("update_bytes", size)
+            except (TypeError, ValueError):
+                pass
+        return self._send_commands(session_id, commands)
+
+
+class RouteInstrumentation:
+    """
+    Per-session hooks that attribute timings and update payloads to the
+    route being shown
+
+    Records per route: navigate_ms (whole navigation including
+    page.update), build_ms and controls (each time a view is built),
+    update_bytes (every update sent to the client while the route is
+    shown), and service call timings via wrap_service.
+    """
+
+    def __init__(self, page: ft.Page, registry: MetricsRegistry):
+        self.page = page
+        self.registry = registry
+        self.route: Optional[str] = None
+        self._hook: Optional[ConnectionHook] = None
+        self._session_id = None
+        self._hook_connection()
+
+    def record(self, metric: str, value: float):
+        self.registry.record(self.route, metric, value)
+
+    def _hook_connection(self):
+        """Measure the serialized size of every command batch this session sends"""
+        connection = getattr(self.page, "connection", None)
+        if getattr(connection, "send_commands", None) is None:
+            return
+        try:
+            from flet.core.protocol import CommandEncoder
+        except ImportError:
+            return
+
+        self._session_id = self.page.session_id
+        self._hook = ConnectionHook.install(connection, CommandEncoder)
+        self._hook.register(self._session_id, self)
+
+        previous_on_close = self.page.on_close
+
+        def on_close(e):
+            self.close()
+            if previous_on_close is not None:
+                previous_on_close(e)
+
+        self.page.on_close = on_close
+
+    def close(self):
+        """Stop measuring this session's updates, so the connection no longer references it"""
+        if self._hook is not None:
+            self._hook.unregister(self._session_id)
+            self._hook = None
+
+    def wrap_navigate(self, navigate: Callable[[str], None]) -> Callable[[str], None]:
+        def navigate_to(route: str):
+            self.route = route
+            start = time.perf_counter()
+            navigate(route)
+            self.record("navigate_ms", (time.perf_counter() - start) * 1000)
+        return navigate_to
+
+    def wrap_builder(self, build: Callable[[], ft.Control]) -> Callable[[], ft.Control]:
+        def timed_build():
+            start = time.perf_counter()
+            view = build()
+            self.record("build_ms", (time.perf_counter() - start) * 1000)
+            self.record("controls", count_controls(view))
+            return view
+        return timed_build
+
+    def wrap_service(self, service: Any, label: str) -> TimedProxy:
+        return TimedProxy(service, label, self)
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    """
+    Process-wide metrics registry, or None unless WATERWISE_METRICS is set
+    to the JSON file to dump to (every WATERWISE_METRICS_INTERVAL seconds,
+    default 60)
+    """
+    global _metrics
+    path = os.environ.get(METRICS_PATH_ENV)
+    if not path:
+        return None
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                registry = MetricsRegistry()
+                registry.start_dumping(path, float(os.environ.get(METRICS_INTERVAL_ENV, "60")))
+                _metrics = registry
+    return _metrics
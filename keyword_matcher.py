@@ -0,0 +1,86 @@
+import re
+from typing import Dict, Iterable, List, Tuple
+
+
+# Key that marks the end of a word in a trie node
+_END = ""
+
+
+def build_trie(words: Iterable[str]) -> Dict[str, dict]:
+    """Nested dicts keyed by character; a node that ends a word holds the _END key"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        if word:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+    return trie
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex source matching any of words, factored into a trie so the regex
+    engine never backtracks across alternatives that share a prefix
+    Where one word is a prefix of another the longer one is tried first.
+    """
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if _END in node:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(build_trie(words))
+
+
+class WordStartMatcher:
+    """
+    Finds keywords that begin at the start of a word (a letter or digit
+    not preceded by one), such as 'vomit' in 'vomiting' but not 'hot' in
+    'shot'
+    All keywords are compiled into one trie-shaped regex. It reports the
+    longest keyword at each word start, and the shorter keywords that are
+    prefixes of it come from a table built up front, so overlapping
+    matches are still all found.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        # Longest keyword at a position -> the shorter keywords that also match there
+        # Walking each keyword down the trie passes the end of every shorter
+        # keyword it starts with, so the table costs one step per character
+        self._prefixes: Dict[str, Tuple[str, ...]] = {}
+        trie = build_trie(self.keywords)
+        for keyword in self.keywords:
+            node = trie
+            prefixes = []
+            for length, char in enumerate(keyword[:-1], start=1):
+                node = node[char]
+                if _END in node:
+                    prefixes.append(keyword[:length])
+            if prefixes:
+                self._prefixes[keyword] = tuple(prefixes)
+        self._pattern = None
+        if self.keywords:
+            self._pattern = re.compile(r"(?<![^\W_])(?=(" + trie_pattern(self.keywords) + "))")
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """
+        Return every (start position, keyword) occurrence at a word start,
+        ordered by start position
+        """
+        if self._pattern is None:
+            return []
+        matches = [(match.start(), match.group(1)) for match in self._pattern.finditer(text)]
+        if not self._prefixes:
+            return matches
+        prefixes = self._prefixes
+        expanded = []
+        for start, keyword in matches:
+            expanded.append((start, keyword))
+            for prefix in prefixes.get(keyword, ()):
+                expanded.append((start, prefix))
+        return expanded
@@ -1,7 +1,10 @@
+import threading
+
 import flet as ft
 from flet import Icons
-from diagnosis_engine import AppTheme, COMMON_SYMPTOMS, load_diseases_data, SymptomExtractor
+from diagnosis_engine import AppTheme, COMMON_SYMPTOMS, load_diseases_data, IncrementalSymptomExtractor, SymptomExtractor
 from hospital_finder import HospitalFinder
+from records import Hospital
 
 
 def create_welcome_page(page: ft.Page, navigate_to):
@@ -191,10 +194,14 @@ def create_welcome_page(page: ft.Page, navigate_to):
 
 
 
-def create_symptom_input_page(page: ft.Page, navigate_to, app_state):
+# Seconds of typing pause before live extraction runs
+LIVE_EXTRACTION_DELAY = 0.35
+
+
+def create_symptom_input_page(page: ft.Page, navigate_to, app_state, symptom_extractor=None):
     """Create AI-powered symptom input page with professional mobile UX"""
     
-    symptom_extractor = SymptomExtractor()
+    symptom_extractor = symptom_extractor or SymptomExtractor()
     extracted_symptoms = []
     
     screen_width = page.width if page.width else 420
@@ -230,6 +237,79 @@ def create_symptom_input_page(page: ft.Page, navigate_to, app_state):
         italic=True
     )
     
+    def create_symptom_chip(symptom: str) -> ft.Container:
+        """Create a detected-symptom chip; its number badge is set by show_symptoms"""
+        number = ft.Text(
+            "",
+            size=12,
+            weight=ft.FontWeight.BOLD,
+            color=AppTheme.WHITE
+        )
+        return ft.Container(
+            content=ft.Row([
+                ft.Container(
+                    content=number,
+                    width=26,
+                    height=26,
+                    bgcolor=AppTheme.STATUS_SUCCESS,
+                    border_radius=13,
+                    alignment=ft.alignment.center
+                ),
+                ft.Text(
+                    symptom,
+                    size=15,
+                    weight=ft.FontWeight.W_600,
+                    color=AppTheme.TEXT_PRIMARY,
+                    expand=True
+                ),
+                ft.Icon(Icons.CHECK_CIRCLE, size=20, color=AppTheme.STATUS_SUCCESS),
+            ],
+            spacing=12,
+            vertical_alignment=ft.CrossAxisAlignment.CENTER
+            ),
+            bgcolor=AppTheme.CARD,
+            padding=12,
+            border_radius=10,
+            border=ft.border.all(1, AppTheme.BORDER),
+            shadow=ft.BoxShadow(
+                spread_radius=0,
+                blur_radius=12,
+                color=AppTheme.SHADOW_SM,
+                offset=ft.Offset(0, 2)
+            ),
+            data=number
+        )
+    
+    # Chips currently shown, by symptom, so updates only touch what changed
+    symptom_chips = {}
+    
+    def show_symptoms(symptoms: list):
+        """Diff the chip list against symptoms instead of rebuilding it"""
+        for symptom in list(symptom_chips):
+            if symptom not in symptoms:
+                del symptom_chips[symptom]
+        
+        chips = []
+        for idx, symptom in enumerate(symptoms):
+            chip = symptom_chips.get(symptom)
+            if chip is None:
+                chip = symptom_chips[symptom] = create_symptom_chip(symptom)
+            chip.data.value = str(idx + 1)
+            chips.append(chip)
+        
+        if detected_symptoms_column.controls != chips:
+            detected_symptoms_column.controls = chips
+        
+        extracted_symptoms.clear()
+        extracted_symptoms.extend(symptoms)
+        
+        if not symptoms:
+            ai_status_text.value = "No symptoms detected. Try being more specific (e.g., 'fever', 'diarrhea', 'vomiting')"
+            ai_status_text.color = AppTheme.STATUS_WARNING
+        else:
+            ai_status_text.value = f"Found {len(symptoms)} symptom(s) from your description"
+            ai_status_text.color = AppTheme.STATUS_SUCCESS
+    
     def analyze_symptoms(e):
         """Use AI to extract symptoms from text"""
         text = symptom_input.value
@@ -242,62 +322,68 @@ def create_symptom_input_page(page: ft.Page, navigate_to, app_state):
             page.update()
             return
         
-        extracted_symptoms.clear()
-        extracted_symptoms.extend(symptom_extractor.extract_symptoms(text))
-        
-        if not extracted_symptoms:
-            ai_status_text.value = "No symptoms detected. Try being more specific (e.g., 'fever', 'diarrhea', 'vomiting')"
-            ai_status_text.color = AppTheme.STATUS_WARNING
-            detected_symptoms_column.controls.clear()
-        else:
-            ai_status_text.value = f"Found {len(extracted_symptoms)} symptom(s) from your description"
-            ai_status_text.color = AppTheme.STATUS_SUCCESS
-            
-            detected_symptoms_column.controls.clear()
-            for idx, symptom in enumerate(extracted_symptoms):
-                detected_symptoms_column.controls.append(
-                    ft.Container(
-                        content=ft.Row([
-                            ft.Container(
-                                content=ft.Text(
-                                    str(idx + 1),
-                                    size=12,
-                                    weight=ft.FontWeight.BOLD,
-                                    color=AppTheme.WHITE
-                                ),
-                                width=26,
-                                height=26,
-                                bgcolor=AppTheme.STATUS_SUCCESS,
-                                border_radius=13,
-                                alignment=ft.alignment.center
-                            ),
-                            ft.Text(
-                                symptom,
-                                size=15,
-                                weight=ft.FontWeight.W_600,
-                                color=AppTheme.TEXT_PRIMARY,
-                                expand=True
-                            ),
-                            ft.Icon(Icons.CHECK_CIRCLE, size=20, color=AppTheme.STATUS_SUCCESS),
-                        ],
-                        spacing=12,
-                        vertical_alignment=ft.CrossAxisAlignment.CENTER
-                        ),
-                        bgcolor=AppTheme.CARD,
-                        padding=12,
-                        border_radius=10,
-                        border=ft.border.all(1, AppTheme.BORDER),
-                        shadow=ft.BoxShadow(
-                            spread_radius=0,
-                            blur_radius=12,
-                            color=AppTheme.SHADOW_SM,
-                            offset=ft.Offset(0, 2)
-                        )
-                    )
-                )
-        
+        with live_lock:
+            show_symptoms(live_extractor.extract_symptoms(text))
         page.update()
     
+    # Live mode: extract on a debounce timer while the user types
+    live_extractor = IncrementalSymptomExtractor(symptom_extractor)
+    live_lock = threading.Lock()
+    live_timer = None
+    live_generation = 0
+    
+    def run_live_extraction(generation: int, text: str):
+        """Timer thread: extract and show symptoms unless newer input arrived"""
+        with live_lock:
+            if generation != live_generation:
+                return
+            if text and text.strip():
+                show_symptoms(live_extractor.extract_symptoms(text))
+            else:
+                show_symptoms([])
+                ai_status_text.value = "Analysis will extract symptoms from your description"
+                ai_status_text.color = AppTheme.TEXT_TERTIARY
+        page.update()
+    
+    def on_input_change(e):
+        """Restart the debounce timer on every edit while live mode is on"""
+        nonlocal live_timer, live_generation
+        if not live_switch.value:
+            return
+        with live_lock:
+            live_generation += 1
+            if live_timer is not None:
+                live_timer.cancel()
+            live_timer = threading.Timer(LIVE_EXTRACTION_DELAY, run_live_extraction,
+                                         args=(live_generation, symptom_input.value or ""))
+            live_timer.daemon = True
+            live_timer.start()
+    
+    def cancel_live_extraction():
+        """Drop the pending extraction, and the result of one already waiting for the lock"""
+        nonlocal live_timer, live_generation
+        with live_lock:
+            live_generation += 1
+            if live_timer is not None:
+                live_timer.cancel()
+                live_timer = None
+    
+    def on_live_toggle(e):
+        app_state['live_extraction'] = live_switch.value
+        if live_switch.value:
+            on_input_change(e)
+        else:
+            cancel_live_extraction()
+    
+    live_switch = ft.Switch(
+        label="Analyze as I type",
+        value=app_state.get('live_extraction', False),
+        active_color=AppTheme.ACCENT,
+        label_style=ft.TextStyle(size=13, color=AppTheme.TEXT_SECONDARY),
+        on_change=on_live_toggle
+    )
+    symptom_input.on_change = on_input_change
+    
     def on_detect_click(e):
         """Proceed to diagnosis"""
         if not extracted_symptoms:
@@ -376,7 +462,9 @@ def create_symptom_input_page(page: ft.Page, navigate_to, app_state):
                         border_radius=14
                     ),
                     
-                    ft.Container(height=18),
+                    ft.Container(height=8),
+                    live_switch,
+                    ft.Container(height=10),
                     
                     ft.Container(
                         content=ft.ElevatedButton(
@@ -487,7 +575,8 @@ def create_result_page(page: ft.Page, navigate_to, app_state, diagnosis_engine):
     """Create diagnosis result page"""
     
     selected_symptoms = app_state.get('selected_symptoms', [])
-    results = diagnosis_engine.match_symptoms(selected_symptoms)
+    # Only the top match is shown
+    results = diagnosis_engine.match_symptoms(selected_symptoms, limit=1)
     
     if not results:
         return ft.Container(
@@ -546,7 +635,7 @@ def create_result_page(page: ft.Page, navigate_to, app_state, diagnosis_engine):
     confidence = top_result['confidence']
     matched_symptoms = top_result['matched_symptoms']
     
-    consult_info = disease.get('consultDoctor', {})
+    consult_info = disease.consult_doctor or {}
     urgency = consult_info.get('urgency', 'medium')
     urgency_color = diagnosis_engine.get_urgency_color(urgency)
     
@@ -600,13 +689,13 @@ def create_result_page(page: ft.Page, navigate_to, app_state, diagnosis_engine):
                             ),
                             ft.Column([
                                 ft.Text(
-                                    disease['name'],
+                                    disease.name,
                                     size=26,
                                     weight=ft.FontWeight.BOLD,
                                     color=AppTheme.TEXT_PRIMARY
                                 ),
                                 ft.Text(
-                                    f"{disease.get('category', 'Disease').capitalize()} | {disease.get('severity', 'Unknown').capitalize()}",
+                                    f"{(disease.category or 'Disease').capitalize()} | {(disease.severity or 'Unknown').capitalize()}",
                                     size=13,
                                     color=AppTheme.TEXT_TERTIARY,
                                     weight=ft.FontWeight.W_500
@@ -680,7 +769,7 @@ def create_result_page(page: ft.Page, navigate_to, app_state, diagnosis_engine):
                                 content=ft.Row([
                                     ft.Icon(Icons.CIRCLE, size=8, color=AppTheme.PRIMARY),
                                     ft.Text(
-                                        s['symptom'],
+                                        s.symptom,
                                         size=15,
                                         color=AppTheme.TEXT_PRIMARY,
                                         weight=ft.FontWeight.W_500
@@ -719,16 +808,16 @@ def create_result_page(page: ft.Page, navigate_to, app_state, diagnosis_engine):
                             ft.Container(
                                 content=ft.Column([
                                     ft.Text(
-                                        remedy['remedy'],
+                                        remedy.remedy,
                                         size=15,
                                         weight=ft.FontWeight.BOLD
                                     ),
                                     ft.Text(
-                                        remedy['instructions'],
+                                        remedy.instructions,
                                         size=13
                                     ),
                                     ft.Text(
-                                        f"Frequency: {remedy['frequency']}",
+                                        f"Frequency: {remedy.frequency}",
                                         size=12,
                                         italic=True,
                                         color=AppTheme.PRIMARY_DARK
@@ -739,7 +828,7 @@ def create_result_page(page: ft.Page, navigate_to, app_state, diagnosis_engine):
                                 ),
                                 padding=ft.padding.only(left=10, top=5, bottom=5)
                             )
-                            for remedy in disease.get('homeRemedies', [])
+                            for remedy in disease.home_remedies or ()
                         ])
                     ]),
                     bgcolor=AppTheme.WHITE,
@@ -798,7 +887,7 @@ def create_result_page(page: ft.Page, navigate_to, app_state, diagnosis_engine):
                                 color=AppTheme.WHITE,
                                 elevation=0,
                                 on_click=lambda _: (
-                                    app_state.update({'detected_disease': disease['name']}),
+                                    app_state.update({'detected_disease': disease.name}),
                                     navigate_to("hospitals")
                                 ),
                                 style=ft.ButtonStyle(
@@ -1250,17 +1339,21 @@ def create_about_page(page: ft.Page, navigate_to):
     )
 
 
-def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
+# Hospitals added to the list per page as the user scrolls
+HOSPITALS_PAGE_SIZE = 10
+
+
+def create_hospital_finder_page(page: ft.Page, navigate_to, app_state, hospital_finder=None):
     """Create hospital finder page with location-based search"""
     
-    hospital_finder = HospitalFinder()
+    hospital_finder = hospital_finder or HospitalFinder()
     screen_width = page.width if page.width else 420
     
     disease_name = app_state.get('detected_disease', 'General')
     
     user_location = None
     user_city = None
-    location_data = hospital_finder.get_user_location()
+    location_data = hospital_finder.get_cached_user_location()
     if location_data:
         user_location = (location_data[0], location_data[1])
         user_city = location_data[2]
@@ -1289,16 +1382,48 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
         border_radius=10
     )
     
-    hospitals_column = ft.Column(controls=[], spacing=12, scroll=ft.ScrollMode.AUTO)
+    hospitals_list = ft.ListView(controls=[], spacing=12, expand=True, on_scroll_interval=100)
+    load_more_button = ft.TextButton("Show more", visible=False,
+                                     style=ft.ButtonStyle(color=AppTheme.PRIMARY))
     
     status_text = ft.Text("", size=13, color=AppTheme.TEXT_TERTIARY, italic=True)
     
-    def create_hospital_card(hospital: dict):
-        """Create a professional hospital card with enhanced layout"""
-        distance = hospital.get('distance_km')
-        travel_time = hospital.get('travel_time')
+    location_text = ft.Text(
+        f"Location: {user_city if user_city else 'Select city below'}",
+        size=14, weight=ft.FontWeight.W_600, color=AppTheme.TEXT_PRIMARY
+    )
+    
+    def on_location_resolved(location_data):
+        """Refresh results once the background location lookup answers"""
+        nonlocal user_location, user_city
+        if not location_data:
+            return
+        user_location = (location_data[0], location_data[1])
+        user_city = location_data[2]
+        location_text.value = f"Location: {user_city}"
+        if user_city in cities:
+            city_dropdown.value = user_city
+        sort_dropdown.value = "distance"
+        search_hospitals()
+    
+    def create_hospital_card():
+        """
+        Create an empty hospital card; bind_hospital_card fills it in
+        Cards are reused across searches and pages, so the heavy container
+        tree is built once per visible slot rather than once per result.
+        """
+        fields = {
+            'name': ft.Text("", size=17, weight=ft.FontWeight.BOLD, color=AppTheme.TEXT_PRIMARY),
+            'type': ft.Text("", size=13, color=AppTheme.TEXT_TERTIARY, weight=ft.FontWeight.W_500),
+            'rating': ft.Text("", size=13, weight=ft.FontWeight.W_600),
+            'distance': ft.Text("", size=13, weight=ft.FontWeight.W_600),
+            'travel_time': ft.Text("", size=13, weight=ft.FontWeight.W_600, color=AppTheme.ACCENT),
+            'address': ft.Text("", size=12, color=AppTheme.TEXT_SECONDARY, expand=True),
+            'specializations': ft.Text("", size=12, color=AppTheme.ACCENT, weight=ft.FontWeight.W_600, expand=True),
+            'hospital': None
+        }
         
-        return ft.Container(
+        card = ft.Container(
             content=ft.Column([
                 ft.Row([
                     ft.Container(
@@ -1313,8 +1438,8 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
                         )
                     ),
                     ft.Column([
-                        ft.Text(hospital['name'], size=17, weight=ft.FontWeight.BOLD, color=AppTheme.TEXT_PRIMARY),
-                        ft.Text(hospital.get('type', 'Hospital'), size=13, color=AppTheme.TEXT_TERTIARY, weight=ft.FontWeight.W_500)
+                        fields['name'],
+                        fields['type']
                     ], spacing=3, expand=True)
                 ], spacing=14),
                 
@@ -1324,7 +1449,7 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
                     ft.Container(
                         content=ft.Row([
                             ft.Icon(Icons.STAR_ROUNDED, size=17, color=AppTheme.STATUS_WARNING),
-                            ft.Text(f"{hospital.get('rating', 'N/A')}/5.0", size=13, weight=ft.FontWeight.W_600)
+                            fields['rating']
                         ], spacing=5),
                         bgcolor=AppTheme.SURFACE,
                         padding=ft.padding.symmetric(horizontal=10, vertical=6),
@@ -1333,7 +1458,7 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
                     ft.Container(
                         content=ft.Row([
                             ft.Icon(Icons.LOCATION_ON, size=17, color=AppTheme.STATUS_CRITICAL),
-                            ft.Text(f"{distance:.1f} km" if distance else "N/A", size=13, weight=ft.FontWeight.W_600)
+                            fields['distance']
                         ], spacing=5),
                         bgcolor=AppTheme.SURFACE,
                         padding=ft.padding.symmetric(horizontal=10, vertical=6),
@@ -1342,7 +1467,7 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
                     ft.Container(
                         content=ft.Row([
                             ft.Icon(Icons.ACCESS_TIME, size=17, color=AppTheme.ACCENT),
-                            ft.Text(travel_time if travel_time else "N/A", size=13, weight=ft.FontWeight.W_600, color=AppTheme.ACCENT)
+                            fields['travel_time']
                         ], spacing=5),
                         bgcolor=AppTheme.SURFACE,
                         padding=ft.padding.symmetric(horizontal=10, vertical=6),
@@ -1353,13 +1478,12 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
                 ft.Container(height=10),
                 ft.Row([
                     ft.Icon(Icons.PLACE_ROUNDED, size=14, color=AppTheme.TEXT_TERTIARY),
-                    ft.Text(hospital.get('address', ''), size=12, color=AppTheme.TEXT_SECONDARY, expand=True)
+                    fields['address']
                 ], spacing=6),
                 ft.Container(
                     content=ft.Row([
                         ft.Icon(Icons.MEDICAL_SERVICES, size=15, color=AppTheme.ACCENT),
-                        ft.Text(", ".join(hospital.get('specializations', [])[:2]), size=12,
-                               color=AppTheme.ACCENT, weight=ft.FontWeight.W_600, expand=True)
+                        fields['specializations']
                     ], spacing=7),
                     bgcolor=AppTheme.SURFACE, padding=10, border_radius=10, margin=ft.margin.only(top=10)
                 ),
@@ -1374,7 +1498,8 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
                         ], spacing=7, alignment=ft.MainAxisAlignment.CENTER),
                         bgcolor=AppTheme.STATUS_SUCCESS, color=AppTheme.WHITE, height=44, expand=True,
                         elevation=0,
-                        on_click=lambda _,h=hospital: page.launch_url(hospital_finder.get_call_url(h.get('phone', ''))),
+                        on_click=lambda _: page.launch_url(
+                            hospital_finder.get_call_url(fields['hospital'].phone or '')),
                         style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=12))
                     ),
                     ft.ElevatedButton(
@@ -1384,49 +1509,109 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
                         ], spacing=7, alignment=ft.MainAxisAlignment.CENTER),
                         bgcolor=AppTheme.ACCENT, color=AppTheme.WHITE, height=44, expand=True,
                         elevation=0,
-                        on_click=lambda _,h=hospital: page.launch_url(hospital_finder.get_directions_url(h, user_location)),
+                        on_click=lambda _: page.launch_url(
+                            hospital_finder.get_directions_url(fields['hospital'], user_location)),
                         style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=12))
                     )
                 ], spacing=12)
             ]),
             bgcolor=AppTheme.WHITE, padding=20, border_radius=16,
             border=ft.border.all(1, AppTheme.BORDER),
-            shadow=ft.BoxShadow(spread_radius=0, blur_radius=16, color=AppTheme.SHADOW_MD, offset=ft.Offset(0, 4))
+            shadow=ft.BoxShadow(spread_radius=0, blur_radius=16, color=AppTheme.SHADOW_MD, offset=ft.Offset(0, 4)),
+            data=fields
         )
+        return card
+    
+    def bind_hospital_card(card: ft.Container, hospital: Hospital):
+        """Show a hospital in an existing card"""
+        fields = card.data
+        distance = hospital.distance_km
+        travel_time = hospital.travel_time
+        
+        fields['hospital'] = hospital
+        fields['name'].value = hospital.name
+        fields['type'].value = hospital.type or 'Hospital'
+        fields['rating'].value = f"{hospital.rating if hospital.rating is not None else 'N/A'}/5.0"
+        fields['distance'].value = f"{distance:.1f} km" if distance else "N/A"
+        fields['travel_time'].value = travel_time if travel_time else "N/A"
+        fields['address'].value = hospital.address or ''
+        fields['specializations'].value = ", ".join((hospital.specializations or [])[:2])
+    
+    # Cards built so far, reused in order by every search and page
+    card_pool = []
+    cursor = None
+    list_lock = threading.Lock()
+    
+    def load_next_page():
+        """Append the cursor's next page of hospitals to the list"""
+        shown = len(hospitals_list.controls)
+        for hospital in cursor.next_page():
+            if shown < len(card_pool):
+                card = card_pool[shown]
+            else:
+                card = create_hospital_card()
+                card_pool.append(card)
+            bind_hospital_card(card, hospital)
+            hospitals_list.controls.append(card)
+            shown += 1
+        
+        load_more_button.visible = cursor.has_more
+        if cursor.has_more:
+            load_more_button.text = f"Show more ({shown} of {cursor.total})"
+    
+    def on_load_more(e=None):
+        with list_lock:
+            if cursor is None or not cursor.has_more:
+                return
+            load_next_page()
+        page.update()
+    
+    def on_list_scroll(e: ft.OnScrollEvent):
+        """Load the next page once the user scrolls within a screen of the end"""
+        if e.max_scroll_extent is not None and e.pixels is not None \
+                and e.pixels >= e.max_scroll_extent - (e.viewport_dimension or 0):
+            on_load_more()
+    
+    hospitals_list.on_scroll = on_list_scroll
+    load_more_button.on_click = on_load_more
     
     def search_hospitals(e=None):
         """Search for hospitals based on filters"""
+        nonlocal cursor
         selected_city = city_dropdown.value
         sort_by = sort_dropdown.value
         
-        results = hospital_finder.find_nearby_hospitals(
-            disease_name=disease_name, user_coords=user_location,
-            city=selected_city, max_distance=50.0, sort_by=sort_by
-        )
-        
-        hospitals_column.controls.clear()
-        
-        if results:
-            status_text.value = f"Found {len(results)} hospital(s) for {disease_name}"
-            status_text.color = AppTheme.STATUS_SUCCESS
-            for hospital in results[:10]:
-                hospitals_column.controls.append(create_hospital_card(hospital))
-        else:
-            status_text.value = f"No hospitals found in {selected_city}"
-            status_text.color = AppTheme.STATUS_CRITICAL
-            hospitals_column.controls.append(
-                ft.Container(
-                    content=ft.Column([
-                        ft.Icon(Icons.SEARCH_OFF, size=60, color=AppTheme.TEXT_TERTIARY),
-                        ft.Text("No Results", size=20, weight=ft.FontWeight.BOLD, color=AppTheme.TEXT_PRIMARY),
-                        ft.Text("Try selecting a different city", size=14, color=AppTheme.TEXT_SECONDARY)
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
-                    padding=40, alignment=ft.alignment.center
-                )
+        with list_lock:
+            cursor = hospital_finder.find_nearby_hospitals_paged(
+                disease_name=disease_name, user_coords=user_location,
+                city=selected_city, max_distance=50.0, sort_by=sort_by, page_size=HOSPITALS_PAGE_SIZE
             )
+            
+            hospitals_list.controls.clear()
+            
+            if cursor.total:
+                status_text.value = f"Found {cursor.total} hospital(s) for {disease_name}"
+                status_text.color = AppTheme.STATUS_SUCCESS
+                load_next_page()
+            else:
+                load_more_button.visible = False
+                status_text.value = f"No hospitals found in {selected_city}"
+                status_text.color = AppTheme.STATUS_CRITICAL
+                hospitals_list.controls.append(
+                    ft.Container(
+                        content=ft.Column([
+                            ft.Icon(Icons.SEARCH_OFF, size=60, color=AppTheme.TEXT_TERTIARY),
+                            ft.Text("No Results", size=20, weight=ft.FontWeight.BOLD, color=AppTheme.TEXT_PRIMARY),
+                            ft.Text("Try selecting a different city", size=14, color=AppTheme.TEXT_SECONDARY)
+                        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
+                        padding=40, alignment=ft.alignment.center
+                    )
+                )
         page.update()
     
     search_hospitals()
+    if location_data is None:
+        hospital_finder.get_user_location_async(on_location_resolved)
     
     return ft.Container(
         content=ft.Column([
@@ -1449,8 +1634,7 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
                     ft.Container(
                         content=ft.Row([
                             ft.Icon(Icons.MY_LOCATION_ROUNDED, size=20, color=AppTheme.PRIMARY),
-                            ft.Text(f"Location: {user_city if user_city else 'Select city below'}",
-                                   size=14, weight=ft.FontWeight.W_600, color=AppTheme.TEXT_PRIMARY)
+                            location_text
                         ], spacing=10),
                         bgcolor=AppTheme.SURFACE, padding=12, border_radius=10
                     ),
@@ -1474,7 +1658,11 @@ def create_hospital_finder_page(page: ft.Page, navigate_to, app_state):
                 border=ft.border.only(bottom=ft.BorderSide(1, AppTheme.BORDER))
             ),
             
-            ft.Container(content=hospitals_column, expand=True, padding=16, bgcolor=AppTheme.BACKGROUND)
+            ft.Container(
+                content=ft.Column([hospitals_list, ft.Row([load_more_button], alignment=ft.MainAxisAlignment.CENTER)],
+                                  spacing=8, expand=True),
+                expand=True, padding=16, bgcolor=AppTheme.BACKGROUND
+            )
         ], spacing=0, expand=True),
         expand=True
     )
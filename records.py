@@ -0,0 +1,177 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+
+class Record(Mapping):
+    """
+    Compact catalog entry with its fields in __slots__
+    A record also reads like the JSON object it was built from
+    (record['homeRemedies'], record.get('lat')), so code written against
+    the raw dicts keeps working. Fields that were missing in the source are
+    left out of that view; fields set to None, as null in the source or
+    through replace(), read as None like the dict key they stand for. Keys
+    without a field are kept in extra. Records are read-only; use replace()
+    to derive a changed copy.
+    """
+
+    __slots__ = ('extra', 'null_keys')
+
+    # (attribute name, JSON key) for every slotted field
+    FIELDS: Tuple[Tuple[str, str], ...] = ()
+    _ATTRIBUTES: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRIBUTES = {key: attribute for attribute, key in cls.FIELDS}
+
+    def __init__(self, extra: Optional[Dict[str, Any]] = None, null_keys: Iterable[str] = (), **values):
+        """
+        Args:
+            extra: JSON keys without a field, and their values
+            null_keys: JSON keys of fields that are present with value None
+            values: field values by attribute name; None means missing
+        """
+        for attribute, _ in self.FIELDS:
+            object.__setattr__(self, attribute, values.pop(attribute, None))
+        if values:
+            raise TypeError(f"{type(self).__name__} has no fields {sorted(values)}")
+        object.__setattr__(self, 'extra', extra or None)
+        object.__setattr__(self, 'null_keys', frozenset(null_keys) or None)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Record":
+        """Build a record from a JSON object"""
+        values = {}
+        extra = {}
+        null_keys = []
+        for key, value in data.items():
+            attribute = cls._ATTRIBUTES.get(key)
+            if attribute is None:
+                extra[key] = value
+            elif value is None:
+                null_keys.append(key)
+            else:
+                values[attribute] = value
+        return cls(extra, null_keys, **values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only; use replace()")
+
+    def __getitem__(self, key: str):
+        attribute = self._ATTRIBUTES.get(key)
+        if attribute is not None:
+            value = getattr(self, attribute)
+            if value is None and (self.null_keys is None or key not in self.null_keys):
+                raise KeyError(key)
+            return value
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        null_keys = self.null_keys or ()
+        for attribute, key in self.FIELDS:
+            if getattr(self, attribute) is not None or key in null_keys:
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{attribute}={getattr(self, attribute)!r}" for attribute, _ in self.FIELDS
+                           if getattr(self, attribute) is not None)
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):
+        return (_restore, (type(self), self.extra, tuple(getattr(self, attribute) for attribute, _ in self.FIELDS),
+                           tuple(self.null_keys or ())))
+
+    def replace(self, **changes) -> "Record":
+        """Copy of the record with some fields changed; a field changed to None stays in the view as None"""
+        values = {attribute: getattr(self, attribute) for attribute, _ in self.FIELDS}
+        values.update(changes)
+        keys = dict(self.FIELDS)
+        null_keys = set(self.null_keys or ())
+        for attribute, value in changes.items():
+            key = keys.get(attribute)
+            if key is None:
+                continue
+            if value is None:
+                null_keys.add(key)
+            else:
+                null_keys.discard(key)
+        return type(self)(self.extra, null_keys, **values)
+
+    def copy(self) -> Dict:
+        """Shallow dict copy, like dict.copy() on the source object"""
+        return dict(self)
+
+    def to_dict(self) -> Dict:
+        """Plain JSON-compatible dict, converting nested records as well"""
+        return {key: _to_json(value) for key, value in self.items()}
+
+
+def _restore(cls, extra, values, null_keys=()):
+    """Unpickle a record (records are read-only, so pickle cannot set slots itself)"""
+    return cls(extra, null_keys, **{attribute: value for (attribute, _), value in zip(cls.FIELDS, values)})
+
+
+def _to_json(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    return value
+
+
+class Symptom(Record):
+    """One documented symptom of a disease"""
+
+    FIELDS = (('symptom', 'symptom'), ('severity', 'severity'))
+    __slots__ = tuple(attribute for attribute, _ in FIELDS)
+
+
+class Remedy(Record):
+    """A home remedy suggested for a disease"""
+
+    FIELDS = (('remedy', 'remedy'), ('instructions', 'instructions'), ('frequency', 'frequency'))
+    __slots__ = tuple(attribute for attribute, _ in FIELDS)
+
+
+class Disease(Record):
+    """Disease catalog entry; symptoms and remedies are tuples of records"""
+
+    FIELDS = (
+        ('id', 'id'), ('name', 'name'), ('category', 'category'), ('severity', 'severity'),
+        ('transmission', 'transmission'), ('symptoms', 'symptoms'), ('home_remedies', 'homeRemedies'),
+        ('consult_doctor', 'consultDoctor')
+    )
+    __slots__ = tuple(attribute for attribute, _ in FIELDS)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Disease":
+        disease = super().from_dict(data)
+        nested = {}
+        if disease.symptoms is not None:
+            nested['symptoms'] = tuple(Symptom.from_dict(s) for s in disease.symptoms)
+        if disease.home_remedies is not None:
+            nested['home_remedies'] = tuple(Remedy.from_dict(r) for r in disease.home_remedies)
+        return disease.replace(**nested) if nested else disease
+
+
+class Hospital(Record):
+    """
+    Hospital registry entry
+    Search results carry distance_km and travel_time as well.
+    """
+
+    FIELDS = (
+        ('id', 'id'), ('name', 'name'), ('type', 'type'), ('specializations', 'specializations'),
+        ('address', 'address'), ('city', 'city'), ('state', 'state'), ('pincode', 'pincode'),
+        ('lat', 'lat'), ('lon', 'lon'), ('phone', 'phone'), ('emergency', 'emergency'),
+        ('rating', 'rating'), ('timings', 'timings'), ('services', 'services'),
+        ('distance_km', 'distance_km'), ('travel_time', 'travel_time')
+    )
+    __slots__ = tuple(attribute for attribute, _ in FIELDS)
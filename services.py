@@ -0,0 +1,200 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from catalog_snapshot import snapshot_path_for
+from diagnosis_engine import DiagnosisEngine, SymptomExtractor, load_diseases_data
+from hospital_finder import HospitalFinder
+
+
+FileVersion = Optional[Tuple[int, int]]
+CatalogVersion = Tuple[FileVersion, FileVersion]
+
+
+def file_version(path: str) -> FileVersion:
+    """(mtime in ns, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def catalog_version(json_path: str) -> CatalogVersion:
+    """Versions of a catalog's JSON file and of its binary snapshot"""
+    return (file_version(json_path), file_version(snapshot_path_for(json_path)))
+
+
+class CatalogSnapshot:
+    """
+    One consistent, fully built set of catalogs and their indexes
+    Snapshots are never modified after construction; a reload builds a new one.
+    """
+
+    def __init__(self, diseases_data, diagnosis_engine: DiagnosisEngine, symptom_extractor: SymptomExtractor,
+                 hospital_finder: HospitalFinder, diseases_version: CatalogVersion,
+                 hospitals_version: CatalogVersion):
+        self.diseases_data = diseases_data
+        self.diagnosis_engine = diagnosis_engine
+        self.symptom_extractor = symptom_extractor
+        self.hospital_finder = hospital_finder
+        self.diseases_version = diseases_version
+        self.hospitals_version = hospitals_version
+
+
+class AppServices:
+    """
+    Diagnosis engine, symptom extractor and hospital finder loaded once per
+    process and shared by every session
+
+    When watching, a background thread polls the catalog files' mtimes
+    (JSON and binary snapshot), rebuilds
+    the changed catalog with all its indexes and swaps in a new snapshot in a
+    single reference assignment, so readers never block and never see a
+    half-built index.
+    """
+
+    def __init__(self, diseases_path: str = 'diseases.json', hospitals_path: str = 'hospitals.json'):
+        self.diseases_path = diseases_path
+        self.hospitals_path = hospitals_path
+        self._reload_lock = threading.Lock()
+        # Catalog name -> file versions that failed to load, so they are not retried every poll
+        self._failed_versions: Dict[str, CatalogVersion] = {}
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self._snapshot = self._build_snapshot()
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current catalogs; hold on to the result to use one consistent version"""
+        return self._snapshot
+
+    @property
+    def diseases_data(self):
+        return self._snapshot.diseases_data
+
+    @property
+    def diagnosis_engine(self) -> DiagnosisEngine:
+        return self._snapshot.diagnosis_engine
+
+    @property
+    def symptom_extractor(self) -> SymptomExtractor:
+        return self._snapshot.symptom_extractor
+
+    @property
+    def hospital_finder(self) -> HospitalFinder:
+        return self._snapshot.hospital_finder
+
+    def _build_snapshot(self) -> CatalogSnapshot:
+        """Load both catalogs"""
+        diseases_version = catalog_version(self.diseases_path)
+        hospitals_version = catalog_version(self.hospitals_path)
+        diseases_data, diagnosis_engine = self._load_diseases()
+        return CatalogSnapshot(diseases_data, diagnosis_engine, SymptomExtractor(), self._load_hospitals(None),
+                               diseases_version, hospitals_version)
+
+    def _load_diseases(self) -> Tuple[dict, DiagnosisEngine]:
+        diseases_data = load_diseases_data(self.diseases_path)
+        return diseases_data, DiagnosisEngine(diseases_data)
+
+    def _load_hospitals(self, old: Optional[HospitalFinder]) -> HospitalFinder:
+        if old is None:
+            return HospitalFinder(data_path=self.hospitals_path)
+        return HospitalFinder(old.distance_mode, old.refine_top_k, old.location_provider,
+                              data_path=self.hospitals_path)
+
+    def _needs_reload(self, name: str, version: CatalogVersion, loaded: CatalogVersion) -> bool:
+        """
+        Whether a catalog's files changed since it was loaded. A catalog whose
+        JSON file is missing, or whose files were already found broken, keeps
+        serving the loaded version.
+        """
+        return version != loaded and version[0] is not None and version != self._failed_versions.get(name)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Rebuild and swap in the catalogs whose files changed since the current
+        snapshot. Each catalog is checked on its own, so a missing or broken
+        hospitals file does not hold back a diseases update, and vice versa.
+        Returns True if a new snapshot was installed.
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            diseases_version = catalog_version(self.diseases_path)
+            hospitals_version = catalog_version(self.hospitals_path)
+            diseases_data, diagnosis_engine = current.diseases_data, current.diagnosis_engine
+            hospital_finder = current.hospital_finder
+            reloaded_diseases = reloaded_hospitals = False
+
+            if self._needs_reload('diseases', diseases_version, current.diseases_version):
+                try:
+                    diseases_data, diagnosis_engine = self._load_diseases()
+                    reloaded_diseases = True
+                    self._failed_versions.pop('diseases', None)
+                except Exception as e:
+                    # Any error, including JSON of the wrong shape, keeps the loaded catalog
+                    print(f"Disease catalog reload error: {e!r}")
+                    self._failed_versions['diseases'] = diseases_version
+
+            if self._needs_reload('hospitals', hospitals_version, current.hospitals_version):
+                try:
+                    hospital_finder = self._load_hospitals(current.hospital_finder)
+                    reloaded_hospitals = True
+                    self._failed_versions.pop('hospitals', None)
+                except Exception as e:
+                    print(f"Hospital catalog reload error: {e!r}")
+                    self._failed_versions['hospitals'] = hospitals_version
+
+            if not (reloaded_diseases or reloaded_hospitals):
+                return False
+            self._snapshot = CatalogSnapshot(
+                diseases_data, diagnosis_engine, current.symptom_extractor, hospital_finder,
+                diseases_version if reloaded_diseases else current.diseases_version,
+                hospitals_version if reloaded_hospitals else current.hospitals_version
+            )
+            return True
+
+    def start_watching(self, interval: float = 5.0):
+        """Poll the catalog files every interval seconds on a daemon thread"""
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    # Never let one bad poll end hot reloading for the process
+                    print(f"Catalog watcher error: {e!r}")
+
+        self._watcher = threading.Thread(target=watch, name="catalog-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background watcher, if running"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+_services: Optional[AppServices] = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> AppServices:
+    """
+    Return the process-wide services, loading them on first use
+    Catalog files are watched for changes every WATERWISE_RELOAD_INTERVAL
+    seconds (default 5; 0 disables hot reloading).
+    """
+    global _services
+    if _services is None:
+        with _services_lock:
+            if _services is None:
+                services = AppServices()
+                interval = float(os.environ.get("WATERWISE_RELOAD_INTERVAL", "5"))
+                if interval > 0:
+                    services.start_watching(interval)
+                _services = services
+    return _services
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root rather than in a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def diseases_path():
+    return os.path.join(ROOT, 'diseases.json')
+
+
+@pytest.fixture(scope="session")
+def hospitals_path():
+    return os.path.join(ROOT, 'hospitals.json')
@@ -0,0 +1,215 @@
+import asyncio
+import http.client
+import json
+import os
+import shutil
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import api_server
+from api_server import ITEM_FAILED, HTTPError, TriageAPI, diagnose_batch, nearby_batch, read_request
+from diagnosis_engine import DiagnosisEngine, SymptomExtractor, load_diseases_data
+from services import AppServices
+
+
+@pytest.fixture(scope="module")
+def server(diseases_path, hospitals_path):
+    api = TriageAPI(diseases_path, hospitals_path, workers=2, max_pending=16, batch_delay=0.005,
+                    reload_interval=0)
+    loop = asyncio.new_event_loop()
+    listener = loop.run_until_complete(asyncio.start_server(api.handle_connection, "127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield listener.sockets[0].getsockname()[1]
+
+    async def stop():
+        listener.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    api.shutdown()
+
+
+def call(port, method, path, body=None, connection=None):
+    """(status, decoded body) of one request, on connection or on a connection of its own"""
+    own = connection is None
+    if own:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        payload = body if isinstance(body, bytes) or body is None else json.dumps(body)
+        connection.request(method, path, body=payload, headers={'Content-Type': "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        if own:
+            connection.close()
+
+
+def raw_exchange(port, data):
+    with socket.create_connection(("127.0.0.1", port), timeout=30) as sock:
+        sock.sendall(data)
+        return sock.recv(4096)
+
+
+def test_health(server):
+    status, body = call(server, "GET", "/health")
+    assert status == 200
+    assert body['status'] == "ok"
+    assert body['diseases'] == 5 and body['hospitals'] > 0
+    assert body['executor']['workers'] == 2
+
+
+def test_extract(server):
+    note = "Severe diarrhea and vomiting, no fever"
+    assert call(server, "POST", "/extract", {'text': note}) == \
+        (200, {'symptoms': SymptomExtractor().extract_symptoms(note)})
+
+
+def test_diagnose_matches_the_engine(server, diseases_path):
+    engine = DiagnosisEngine(load_diseases_data(diseases_path))
+    status, body = call(server, "POST", "/diagnose", {'symptoms': ["Diarrhea", "Vomiting"], 'limit': 2})
+    assert status == 200
+    expected = engine.match_symptoms(["Diarrhea", "Vomiting"], limit=2)
+    assert [(match['disease']['name'], match['confidence']) for match in body['matches']] == \
+        [(match['disease']['name'], match['confidence']) for match in expected]
+    assert body['matches'][0]['disease'] == expected[0]['disease'].to_dict()
+
+
+def test_hospitals_nearby_pages(server):
+    query = {'disease': "Cholera", 'lat': 19.07, 'lon': 72.87}
+    status, everything = call(server, "POST", "/hospitals/nearby", dict(query, limit=50))
+    assert status == 200
+    status, page = call(server, "POST", "/hospitals/nearby", dict(query, limit=2, offset=1))
+    assert status == 200
+    assert page['total'] == everything['total']
+    assert page['hospitals'] == everything['hospitals'][1:3]
+
+
+def test_batch_answers_in_order(server):
+    notes = ["fever", "no vomiting", "diarrhea and headache"]
+    status, body = call(server, "POST", "/extract", {'batch': [{'text': note} for note in notes]})
+    assert status == 200
+    extractor = SymptomExtractor()
+    assert body['results'] == [{'symptoms': extractor.extract_symptoms(note)} for note in notes]
+
+
+def test_concurrent_singles_are_batched(server):
+    notes = [f"patient has diarrhea and {word} since {i} days"
+             for i, word in enumerate(["fever", "vomiting", "headache", "cramps"] * 10)]
+    with ThreadPoolExecutor(16) as pool:
+        responses = list(pool.map(lambda note: call(server, "POST", "/extract", {'text': note}), notes))
+    extractor = SymptomExtractor()
+    assert responses == [(200, {'symptoms': extractor.extract_symptoms(note)}) for note in notes]
+
+
+def test_keep_alive(server):
+    connection = http.client.HTTPConnection("127.0.0.1", server, timeout=30)
+    try:
+        for _ in range(3):
+            assert call(server, "POST", "/extract", {'text': "fever"}, connection)[0] == 200
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("method,path,body,status", [
+    ("POST", "/extract", {'txt': "fever"}, 400),
+    ("POST", "/extract", b"{bad", 400),
+    ("GET", "/extract", None, 405),
+    ("POST", "/health", {}, 405),
+    ("POST", "/nope", {}, 404),
+    ("POST", "/diagnose", {'symptoms': "fever"}, 400),
+    ("POST", "/diagnose", {'symptoms': ["fever"], 'limit': 0}, 400),
+    ("POST", "/hospitals/nearby", {'disease': "Cholera", 'lat': 19.0}, 400),
+    ("POST", "/hospitals/nearby", {'disease': "Cholera", 'sort_by': "name"}, 400),
+    ("POST", "/hospitals/nearby", {'disease': "Cholera", 'lat': float("nan"), 'lon': 72.0}, 400),
+    ("POST", "/hospitals/nearby", {'disease': "Cholera", 'lat': 19.0, 'lon': float("inf")}, 400),
+    ("POST", "/hospitals/nearby", {'disease': "Cholera", 'lat': 91.0, 'lon': 72.0}, 400),
+    ("POST", "/hospitals/nearby", {'disease': "Cholera", 'lat': 19.0, 'lon': -180.5}, 400),
+    ("POST", "/hospitals/nearby", {'disease': "Cholera", 'lat': 19.0, 'lon': 72.0, 'max_distance': float("nan")}, 400),
+    ("POST", "/hospitals/nearby", {'disease': "Cholera", 'lat': 19.0, 'lon': 72.0, 'max_distance': -1}, 400),
+    ("POST", "/diagnose", {'batch': 3}, 400),
+    ("POST", "/extract", {'batch': [{'text': "fever"}] * 1001}, 413),
+])
+def test_invalid_requests(server, method, path, body, status):
+    response_status, response = call(server, method, path, body)
+    assert response_status == status
+    assert 'error' in response
+
+
+@pytest.mark.parametrize("data", [
+    b"garbage\r\n\r\n",
+    b"GET /health HTTP/2.0\r\n\r\n",
+    b"GET /" + b"a" * 70000 + b" HTTP/1.1\r\n\r\n",
+    b"GET /health HTTP/1.1\r\nX-Long: " + b"a" * 70000 + b"\r\n\r\n",
+])
+def test_malformed_requests_get_400(server, data):
+    assert raw_exchange(server, data).startswith(b"HTTP/1.1 400 ")
+
+
+def test_read_request_parses_body():
+    async def parse(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_request(reader)
+
+    request = asyncio.run(parse(b"POST /extract HTTP/1.1\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{}"))
+    assert (request.method, request.path, request.body, request.keep_alive) == ("POST", "/extract", b"{}", False)
+    assert asyncio.run(parse(b"")) is None
+    with pytest.raises(HTTPError):
+        asyncio.run(parse(b"GET / HTTP/1.1\r\nContent-Length: x\r\n\r\n"))
+
+
+def test_one_failing_item_does_not_fail_its_batch(diseases_path, hospitals_path):
+    snapshot = AppServices(diseases_path, hospitals_path).snapshot()
+    good = {'disease': "Cholera", 'user_coords': (19.07, 72.87), 'city': None, 'max_distance': 50.0,
+            'sort_by': "distance", 'limit': 3, 'offset': 0}
+    # Bypasses request validation, as a bug in the search would
+    bad = dict(good, user_coords=(float("nan"), 72.87))
+    results = nearby_batch(snapshot, [good, bad, good])
+    assert results[1] is ITEM_FAILED
+    assert results[0] == results[2] and len(results[0]['hospitals']) == 3
+
+    results = diagnose_batch(snapshot, [(["Fever"], None), (None, None), (["Diarrhea"], 1)])
+    assert results[1] is ITEM_FAILED
+    assert len(results[2]['matches']) == 1 and results[0]['matches']
+
+
+def worker_snapshot_id():
+    return id(api_server._worker_snapshot)
+
+
+@pytest.mark.skipif(api_server.FORK_CONTEXT is None, reason="workers are forked only where fork exists")
+def test_workers_share_the_server_catalogs_and_follow_reloads(diseases_path, hospitals_path, tmp_path):
+    paths = str(tmp_path / "diseases.json"), str(tmp_path / "hospitals.json")
+    shutil.copy(diseases_path, paths[0])
+    shutil.copy(hospitals_path, paths[1])
+    api = TriageAPI(*paths, workers=2, reload_interval=0)
+    try:
+        # A forked worker sees the very object the server loaded, at the same address
+        assert asyncio.run(api.executor.run(worker_snapshot_id)) == id(api.services.snapshot())
+
+        with open(paths[0]) as f:
+            data = json.load(f)
+        data['diseases'] = data['diseases'][:1]
+        with open(paths[0], "w") as f:
+            json.dump(data, f)
+        mtime = os.stat(paths[0]).st_mtime_ns + 10 ** 9
+        os.utime(paths[0], ns=(mtime, mtime))
+        assert api.services.reload_if_changed()
+
+        assert asyncio.run(api.executor.run(worker_snapshot_id)) == id(api.services.snapshot())
+        assert api.executor.restarts == 1
+        results = asyncio.run(api.executor.run(api_server._run_job, "/diagnose", [(["Diarrhea"], None)]))
+        assert len(json.loads(results[0][1])['matches']) == 1
+    finally:
+        api.shutdown()
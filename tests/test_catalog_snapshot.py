@@ -0,0 +1,168 @@
+import json
+import os
+import random
+import shutil
+
+import pytest
+
+from catalog_snapshot import (SnapshotError, export_diseases, export_hospitals, load_diseases_snapshot,
+                              snapshot_path_for)
+from diagnosis_engine import DiagnosisEngine, load_diseases_data
+from hospital_finder import HospitalFinder, StaticLocationProvider
+from records import Disease, Hospital
+
+MUMBAI = (19.07, 72.87)
+
+
+def copy_catalog(source, tmp_path):
+    path = str(tmp_path / os.path.basename(source))
+    shutil.copy(source, path)
+    return path
+
+
+def make_older(json_path):
+    """Date the JSON file back, so its snapshot counts as fresh"""
+    stat = os.stat(snapshot_path_for(json_path))
+    os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+
+
+def make_finder(path):
+    return HospitalFinder("haversine", location_provider=StaticLocationProvider(None), data_path=path)
+
+
+def corruptions():
+    """(name, function of the snapshot bytes) pairs that damage a snapshot"""
+    return [
+        ("empty", lambda data: b""),
+        ("truncated preamble", lambda data: data[:10]),
+        ("truncated header", lambda data: data[:40]),
+        ("truncated arrays", lambda data: data[:len(data) // 2]),
+        ("bad magic", lambda data: b"NOTASNAP" + data[8:]),
+        ("other format", lambda data: data[:8] + b"\x63\x00\x00\x00" + data[12:]),
+        ("huge header length", lambda data: data[:12] + b"\xff\xff\xff\x7f" + data[16:]),
+        ("garbled header", lambda data: data[:16] + b"\xff" * 32 + data[48:]),
+    ]
+
+
+@pytest.fixture
+def diseases_copy(diseases_path, tmp_path):
+    path = copy_catalog(diseases_path, tmp_path)
+    export_diseases(path)
+    make_older(path)
+    return path
+
+
+@pytest.fixture
+def hospitals_copy(hospitals_path, tmp_path):
+    path = copy_catalog(hospitals_path, tmp_path)
+    export_hospitals(path)
+    make_older(path)
+    return path
+
+
+def damage(json_path, corrupt):
+    snapshot_path = snapshot_path_for(json_path)
+    with open(snapshot_path, "rb") as f:
+        data = f.read()
+    with open(snapshot_path, "wb") as f:
+        f.write(corrupt(data))
+    make_older(json_path)
+
+
+def test_diseases_round_trip(diseases_copy):
+    with open(diseases_copy) as f:
+        expected = json.load(f)
+    loaded = load_diseases_snapshot(diseases_copy)
+    assert loaded['metadata'] == expected['metadata']
+    assert all(isinstance(disease, Disease) for disease in loaded['diseases'])
+    assert [disease.to_dict() for disease in loaded['diseases']] == \
+        [Disease.from_dict(disease).to_dict() for disease in expected['diseases']]
+
+
+def test_engine_matches_the_same_from_snapshot(diseases_copy, diseases_path):
+    from_snapshot = DiagnosisEngine(load_diseases_data(diseases_copy))
+    from_json = DiagnosisEngine(load_diseases_data(diseases_path))
+    for selected in (['Diarrhea', 'Vomiting'], ['Fever', 'Headache'], ['Jaundice', 'Fatigue']):
+        assert from_snapshot.match_symptoms(selected) == from_json.match_symptoms(selected)
+
+
+def test_hospitals_round_trip(hospitals_copy, hospitals_path):
+    from_snapshot = make_finder(hospitals_copy)
+    from_json = make_finder(hospitals_path)
+    assert from_snapshot.disease_mapping == from_json.disease_mapping
+    assert [hospital.to_dict() for hospital in from_snapshot.hospitals] == \
+        [hospital.to_dict() for hospital in from_json.hospitals]
+    for sort_by in ("distance", "rating"):
+        assert from_snapshot.find_nearby_hospitals("Cholera", MUMBAI, sort_by=sort_by) == \
+            from_json.find_nearby_hospitals("Cholera", MUMBAI, sort_by=sort_by)
+
+
+def test_stale_snapshot_is_ignored(diseases_copy):
+    with open(diseases_copy) as f:
+        data = json.load(f)
+    data['diseases'] = data['diseases'][:1]
+    with open(diseases_copy, "w") as f:
+        json.dump(data, f)
+    stat = os.stat(snapshot_path_for(diseases_copy))
+    os.utime(diseases_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert len(load_diseases_data(diseases_copy)['diseases']) == 1
+
+
+@pytest.mark.parametrize("name,corrupt", corruptions())
+def test_corrupt_diseases_snapshot_falls_back_to_json(diseases_copy, name, corrupt):
+    damage(diseases_copy, corrupt)
+    with pytest.raises(SnapshotError):
+        load_diseases_snapshot(diseases_copy)
+    with open(diseases_copy) as f:
+        assert load_diseases_data(diseases_copy) == json.load(f)
+
+
+@pytest.mark.parametrize("name,corrupt", corruptions())
+def test_corrupt_hospitals_snapshot_falls_back_to_json(hospitals_copy, hospitals_path, name, corrupt):
+    damage(hospitals_copy, corrupt)
+    finder = make_finder(hospitals_copy)
+    assert all(isinstance(hospital, Hospital) for hospital in finder.hospitals)
+    assert [hospital.to_dict() for hospital in finder.hospitals] == \
+        [hospital.to_dict() for hospital in make_finder(hospitals_path).hospitals]
+
+
+def test_random_damage_never_escapes_as_another_error(diseases_copy):
+    snapshot_path = snapshot_path_for(diseases_copy)
+    with open(snapshot_path, "rb") as f:
+        original = f.read()
+    rng = random.Random(5)
+    for _ in range(200):
+        data = bytearray(original)
+        for _ in range(rng.randint(1, 8)):
+            data[rng.randrange(len(data))] = rng.randrange(256)
+        damage(diseases_copy, lambda _: bytes(data))
+        try:
+            load_diseases_snapshot(diseases_copy)
+        except SnapshotError:
+            pass
+
+
+def test_mixed_fields_keep_their_json_types(hospitals_path, tmp_path):
+    with open(hospitals_path) as f:
+        data = json.load(f)
+    for position, hospital in enumerate(data['hospitals']):
+        # Registries mix numeric and text pincodes, and carry integer counts
+        if position % 2:
+            hospital['pincode'] = int(hospital['pincode'])
+        hospital['beds'] = 100 + position
+        hospital['rating'] = 4
+    path = str(tmp_path / "hospitals.json")
+    with open(path, "w") as f:
+        json.dump(data, f)
+    from_json = make_finder(path)
+    export_hospitals(path)
+    make_older(path)
+    from_snapshot = make_finder(path)
+
+    assert dict(from_snapshot.pincode_index) == dict(from_json.pincode_index)
+    assert len(from_snapshot.pincode_index) > 0
+    hospitals = [hospital.to_dict() for hospital in from_snapshot.hospitals]
+    assert hospitals == [hospital.to_dict() for hospital in from_json.hospitals]
+    assert type(hospitals[0]['beds']) is int and type(hospitals[1]['pincode']) is int
+    assert from_snapshot.find_nearby_hospitals("Cholera", MUMBAI, sort_by="rating") == \
+        from_json.find_nearby_hospitals("Cholera", MUMBAI, sort_by="rating")
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from benchmark import generate_diseases, generate_symptom_db, generate_symptom_selections
+from diagnosis_engine import DiagnosisEngine, load_diseases_data
+
+
+@pytest.fixture(scope="module")
+def engine(diseases_path):
+    return DiagnosisEngine(load_diseases_data(diseases_path))
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    rng = random.Random(11)
+    symptom_names = list(generate_symptom_db(rng, 60, 2))
+    diseases_data = generate_diseases(rng, 150, symptom_names)
+    return diseases_data, generate_symptom_selections(rng, 300, symptom_names)
+
+
+def reference_matches(diseases, selected):
+    """The original nested-loop matcher: (name, confidence, match_count), highest confidence first"""
+    results = []
+    for disease in diseases:
+        matched = 0
+        for symptom in selected:
+            if any(symptom.lower() in entry['symptom'].lower() for entry in disease['symptoms']):
+                matched += 1
+        if matched:
+            results.append((disease['name'], round(matched / len(disease['symptoms']) * 100, 1), matched))
+    results.sort(key=lambda result: result[1], reverse=True)
+    return results
+
+
+def summary(matches):
+    return [(match['disease']['name'], match['confidence'], match['match_count']) for match in matches]
+
+
+@pytest.mark.parametrize("selected,expected", [
+    (['Diarrhea', 'Vomiting'], [('Cholera', 50.0, 2), ('Typhoid', 20.0, 1), ('Hepatitis A', 14.3, 1)]),
+    (['Fever'], [('Typhoid', 20.0, 1)]),
+    (['Fever', 'Headache', 'Abdominal pain'], [('Typhoid', 60.0, 3), ('Hepatitis A', 14.3, 1)]),
+    (['Jaundice', 'Dark urine', 'Fatigue'], [('Hepatitis A', 42.9, 3), ('Giardiasis', 25.0, 1)]),
+    ([], []),
+    (['Unknown symptom'], []),
+])
+def test_catalog_matches(engine, selected, expected):
+    assert summary(engine.match_symptoms(selected)) == expected
+
+
+def test_matched_symptoms_follow_disease_order(engine):
+    top = engine.match_symptoms(['Dark urine', 'Jaundice', 'Fatigue'])[0]
+    assert [entry['symptom'] for entry in top['matched_symptoms']] == [
+        'Fatigue', 'Jaundice (yellowing skin/eyes)', 'Dark urine'
+    ]
+
+
+def test_selection_is_a_set(engine):
+    assert summary(engine.match_symptoms(['diarrhea', ' VOMITING ', 'Diarrhea'])) == \
+        summary(engine.match_symptoms(['Diarrhea', 'Vomiting']))
+
+
+def test_matches_reference_on_generated_catalog(synthetic):
+    diseases_data, selections = synthetic
+    engine = DiagnosisEngine(diseases_data, cache_size=0)
+    for selected in selections:
+        assert summary(engine.match_symptoms(selected)) == reference_matches(diseases_data['diseases'], selected)
+
+
+def test_batch_matches_single(synthetic):
+    diseases_data, selections = synthetic
+    engine = DiagnosisEngine(diseases_data)
+    for limit in (None, 3):
+        batch = engine.match_symptoms_batch(selections, chunk_size=64, limit=limit)
+        assert [summary(matches) for matches in batch] == \
+            [summary(engine.match_symptoms(selected, limit=limit)) for selected in selections]
+
+
+def test_limit_keeps_the_best_matches(synthetic):
+    diseases_data, selections = synthetic
+    engine = DiagnosisEngine(diseases_data)
+    for selected in selections[:50]:
+        assert summary(engine.match_symptoms(selected, limit=2)) == summary(engine.match_symptoms(selected))[:2]
+
+
+def test_cached_results_cannot_be_mutated(engine):
+    first = engine.match_symptoms(['Diarrhea', 'Vomiting'])
+    first[0]['matched_symptoms'].clear()
+    first.clear()
+    again = engine.match_symptoms(['Diarrhea', 'Vomiting'])
+    assert summary(again)[0] == ('Cholera', 50.0, 2)
+    assert len(again[0]['matched_symptoms']) == 2
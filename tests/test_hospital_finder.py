@@ -0,0 +1,104 @@
+import json
+import random
+
+import pytest
+
+from benchmark import generate_hospitals
+from hospital_finder import HospitalCursor, HospitalFinder, HospitalList, LocationProvider, StaticLocationProvider
+
+DISEASES = ["Cholera", "Typhoid", "Hepatitis A"]
+MUMBAI = (19.076, 72.8777)
+
+
+@pytest.fixture(scope="module")
+def finder(tmp_path_factory):
+    path = tmp_path_factory.mktemp("hospitals") / "hospitals.json"
+    with open(path, "w") as f:
+        json.dump(generate_hospitals(random.Random(3), 3000, DISEASES), f)
+    return HospitalFinder("haversine", location_provider=StaticLocationProvider(None), data_path=str(path))
+
+
+def ids(hospitals):
+    return [hospital['id'] for hospital in hospitals]
+
+
+def read_all(cursor):
+    hospitals = []
+    while cursor.has_more:
+        page = cursor.next_page()
+        assert 0 < len(page) <= cursor.page_size
+        hospitals.extend(page)
+    assert cursor.next_page() == []
+    return hospitals
+
+
+SEARCHES = [
+    dict(disease_name="Cholera", user_coords=MUMBAI, sort_by="distance"),
+    dict(disease_name="Typhoid", user_coords=MUMBAI, sort_by="rating"),
+    dict(disease_name="Hepatitis A", user_coords=MUMBAI, max_distance=5.0),
+    dict(disease_name="Cholera", user_coords=MUMBAI, city="Delhi", sort_by="rating"),
+    dict(disease_name="Typhoid", city="Mumbai", sort_by="distance"),
+]
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+@pytest.mark.parametrize("page_size", [1, 7, 50])
+def test_pages_follow_the_full_ranking(finder, search, page_size):
+    ranking = finder.find_nearby_hospitals(**search)
+    cursor = finder.find_nearby_hospitals_paged(page_size=page_size, **search)
+    assert cursor.total == len(ranking)
+    assert read_all(cursor) == ranking
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_limit_is_a_prefix_of_the_ranking(finder, search):
+    ranking = finder.find_nearby_hospitals(**search)
+    for limit in (1, 10, len(ranking) + 5):
+        limited = finder.find_nearby_hospitals(limit=limit, **search)
+        assert isinstance(limited, HospitalList)
+        assert limited == ranking[:limit]
+        assert limited.total == len(ranking)
+
+
+def test_distance_ranking_is_ordered(finder):
+    ranking = finder.find_nearby_hospitals("Cholera", MUMBAI)
+    distances = [hospital['distance_km'] for hospital in ranking]
+    known = [distance for distance in distances if distance is not None]
+    # Hospitals without coordinates still carry distance_km, as None, after the rest
+    assert len(known) < len(distances)
+    assert known == sorted(known)
+    assert distances[:len(known)] == known
+    assert all(distance <= 50.0 for distance in known)
+
+
+def test_rating_ranking_is_ordered(finder):
+    ratings = [hospital['rating'] for hospital in finder.find_nearby_hospitals("Typhoid", MUMBAI, sort_by="rating")]
+    assert ratings == sorted(ratings, reverse=True)
+
+
+def test_lazy_ranking_matches_the_list(finder):
+    results = finder.rank_nearby_hospitals("Cholera", MUMBAI, limit=20)
+    assert list(results) == finder.find_nearby_hospitals("Cholera", MUMBAI, limit=20)
+    assert results.total == finder.find_nearby_hospitals("Cholera", MUMBAI).total
+
+
+def test_cursor_reads_ahead_of_the_heap(finder):
+    cursor = finder.find_nearby_hospitals_paged("Cholera", MUMBAI, page_size=10)
+    ranking = finder.find_nearby_hospitals("Cholera", MUMBAI)
+    assert ids(cursor.next_page()) == ids(ranking[:10])
+    assert ids(cursor.next_page()) == ids(ranking[10:20])
+    assert cursor.offset == 20
+
+
+def test_cursor_rejects_empty_pages(finder):
+    with pytest.raises(ValueError):
+        HospitalCursor(finder.rank_nearby_hospitals("Cholera", MUMBAI), page_size=0)
+
+
+def test_location_providers_must_implement_locate():
+    class Incomplete(LocationProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    assert StaticLocationProvider((19.0, 72.8, "Mumbai")).locate() == (19.0, 72.8, "Mumbai")
@@ -0,0 +1,47 @@
+import pickle
+
+import pytest
+
+from records import Disease, Hospital
+
+
+def test_missing_fields_are_left_out():
+    hospital = Hospital.from_dict({'id': "h1", 'name': "City Hospital"})
+    assert 'lat' not in hospital
+    with pytest.raises(KeyError):
+        hospital['lat']
+    assert hospital.get('lat') is None
+    assert hospital.to_dict() == {'id': "h1", 'name': "City Hospital"}
+
+
+def test_null_fields_read_as_none():
+    hospital = Hospital.from_dict({'id': "h1", 'lat': None, 'beds': 10})
+    assert hospital['lat'] is None
+    assert dict(hospital) == {'id': "h1", 'lat': None, 'beds': 10}
+
+
+def test_fields_replaced_with_none_stay_in_the_view():
+    hospital = Hospital.from_dict({'id': "h1", 'name': "City Hospital"})
+    result = hospital.replace(distance_km=None, travel_time=None)
+    assert result['distance_km'] is None and result['travel_time'] is None
+    assert result.to_dict() == {'id': "h1", 'name': "City Hospital", 'distance_km': None, 'travel_time': None}
+
+    located = result.replace(distance_km=2.5, travel_time="5 mins")
+    assert located.to_dict() == {'id': "h1", 'name': "City Hospital", 'distance_km': 2.5, 'travel_time': "5 mins"}
+    assert 'distance_km' in located.replace(distance_km=None)
+
+
+def test_records_pickle_with_their_null_fields():
+    hospital = Hospital.from_dict({'id': "h1", 'beds': 10}).replace(distance_km=None)
+    restored = pickle.loads(pickle.dumps(hospital))
+    assert restored.to_dict() == hospital.to_dict() == {'id': "h1", 'beds': 10, 'distance_km': None}
+
+
+def test_disease_nested_records():
+    disease = Disease.from_dict({
+        'name': "Cholera",
+        'symptoms': [{'symptom': "Vomiting", 'severity': "high"}],
+        'homeRemedies': [{'remedy': "ORS", 'instructions': None}],
+    })
+    assert disease['symptoms'][0]['symptom'] == "Vomiting"
+    assert disease.to_dict()['homeRemedies'] == [{'remedy': "ORS", 'instructions': None}]
@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from services import AppServices
+
+
+def rewrite(path, data):
+    """Write a catalog and move its mtime forward, so the change is seen even on coarse clocks"""
+    previous = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    with open(path, "w") as f:
+        if isinstance(data, str):
+            f.write(data)
+        else:
+            json.dump(data, f)
+    mtime = max(previous, os.stat(path).st_mtime_ns) + 10 ** 9
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def catalogs(diseases_path, hospitals_path, tmp_path):
+    paths = str(tmp_path / "diseases.json"), str(tmp_path / "hospitals.json")
+    shutil.copy(diseases_path, paths[0])
+    shutil.copy(hospitals_path, paths[1])
+    return paths
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def drop_first(path, key):
+    data = load(path)
+    data[key] = data[key][1:]
+    rewrite(path, data)
+    return len(data[key])
+
+
+def test_unchanged_files_keep_the_snapshot(catalogs):
+    services = AppServices(*catalogs)
+    snapshot = services.snapshot()
+    assert not services.reload_if_changed()
+    assert services.snapshot() is snapshot
+
+
+def test_diseases_reload_alone(catalogs):
+    services = AppServices(*catalogs)
+    before = services.snapshot()
+    count = drop_first(catalogs[0], 'diseases')
+
+    assert services.reload_if_changed()
+    after = services.snapshot()
+    assert len(after.diagnosis_engine.diseases) == count
+    assert after.hospital_finder is before.hospital_finder
+    assert not services.reload_if_changed()
+
+
+def test_hospitals_reload_alone(catalogs):
+    services = AppServices(*catalogs)
+    before = services.snapshot()
+    count = drop_first(catalogs[1], 'hospitals')
+
+    assert services.reload_if_changed()
+    after = services.snapshot()
+    assert len(after.hospital_finder.hospitals) == count
+    assert after.diagnosis_engine is before.diagnosis_engine
+
+
+def test_missing_hospitals_file_does_not_block_diseases(catalogs):
+    services = AppServices(*catalogs)
+    finder = services.hospital_finder
+    os.remove(catalogs[1])
+    count = drop_first(catalogs[0], 'diseases')
+
+    assert services.reload_if_changed()
+    assert len(services.diagnosis_engine.diseases) == count
+    assert services.hospital_finder is finder
+
+
+def test_broken_hospitals_file_is_not_retried_until_it_changes(catalogs):
+    services = AppServices(*catalogs)
+    finder = services.hospital_finder
+    original = load(catalogs[1])
+    rewrite(catalogs[1], "{broken")
+    count = drop_first(catalogs[0], 'diseases')
+
+    assert services.reload_if_changed()
+    assert len(services.diagnosis_engine.diseases) == count
+    assert services.hospital_finder is finder
+    assert not services.reload_if_changed()
+
+    rewrite(catalogs[1], original)
+    assert services.reload_if_changed()
+    assert services.hospital_finder is not finder
+    assert len(services.hospital_finder.hospitals) == len(original['hospitals'])
+
+
+def test_broken_diseases_file_keeps_serving_the_loaded_catalog(catalogs):
+    services = AppServices(*catalogs)
+    engine = services.diagnosis_engine
+    rewrite(catalogs[0], "{broken")
+
+    assert not services.reload_if_changed()
+    assert services.diagnosis_engine is engine
+
+
+def test_added_hospitals_file_is_loaded(catalogs):
+    original = load(catalogs[1])
+    os.remove(catalogs[1])
+    services = AppServices(*catalogs)
+    assert len(services.hospital_finder.hospitals) == 0
+
+    rewrite(catalogs[1], original)
+    assert services.reload_if_changed()
+    assert len(services.hospital_finder.hospitals) == len(original['hospitals'])
+
+
+def without_symptom_names(path):
+    data = load(path)
+    for symptom in data['diseases'][0]['symptoms']:
+        del symptom['symptom']
+    return data
+
+
+@pytest.mark.parametrize("catalog,bad", [
+    (0, lambda path: []),
+    (0, lambda path: {'diseases': [[]]}),
+    (0, without_symptom_names),
+    (1, lambda path: []),
+    (1, lambda path: {'hospitals': "none"}),
+])
+def test_structurally_invalid_catalog_is_kept_out(catalogs, catalog, bad):
+    services = AppServices(*catalogs)
+    snapshot = services.snapshot()
+    rewrite(catalogs[catalog], bad(catalogs[catalog]))
+
+    assert not services.reload_if_changed()
+    assert services.snapshot() is snapshot
+    assert not services.reload_if_changed()
+
+
+def test_watcher_survives_a_bad_catalog(catalogs):
+    services = AppServices(*catalogs)
+    original = load(catalogs[0])
+    services.start_watching(0.01)
+    try:
+        rewrite(catalogs[0], [])
+        time.sleep(0.1)
+        assert services._watcher.is_alive()
+
+        original['diseases'] = original['diseases'][:2]
+        rewrite(catalogs[0], original)
+        deadline = time.monotonic() + 5
+        while len(services.diagnosis_engine.diseases) != 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(services.diagnosis_engine.diseases) == 2
+    finally:
+        services.stop_watching()
@@ -0,0 +1,144 @@
+import random
+import re
+import time
+
+import pytest
+
+from diagnosis_engine import SymptomExtractor
+from keyword_matcher import WordStartMatcher, trie_pattern
+from text_normalizer import NoteTokenizer
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return SymptomExtractor()
+
+
+# Notes that only use the original separators (',', ';' and ' and '), with
+# the symptoms the original str.replace splitter extracted from them
+BASELINE_NOTES = [
+    ("Severe diarrhea and vomiting, no fever", ['Diarrhea', 'Vomiting']),
+    ("patient has diarrhea and fever since 3 days", ['Diarrhea', 'Fever']),
+    ("high fever; headache and body ache", ['Fever', 'Headache', 'Body pain']),
+    ("loose stool, stomach cramps and nausea", ['Diarrhea', 'Loose stools', 'Stomach cramps', 'Nausea']),
+    ("no vomiting, mild headache", []),
+    ("feeling dizzy and very thirsty", ['Dehydration']),
+    ("yellow eyes and dark urine", ['Jaundice', 'Dark urine']),
+    ("watery stool and dehydration", ['Diarrhea', 'Dehydration']),
+    ("no diarrhea; fever", ['Fever']),
+    ("I have abdominal pain and nausea", ['Abdominal pain', 'Nausea']),
+    ("mild fever and vomiting", ['Vomiting']),
+    ("", []),
+    ("chills, sweating and high temperature", ['Fever']),
+    ("experiencing fatigue and weakness", ['Fatigue']),
+    ("no fever and no vomiting", []),
+    ("not vomiting, diarrhea", ['Diarrhea']),
+    ("denies fever; rash and itching", ['Rash']),
+]
+
+# Notes whose result changed with the clause rules of NoteTokenizer:
+# (note, original result, current result)
+CHANGED_NOTES = [
+    # 'but' and 'with' end a clause, so negation and 'mild' no longer reach past them
+    ("no fever but vomiting", [], ['Vomiting']),
+    ("no nausea but headache", [], ['Headache']),
+    ("mild fever with headache", [], ['Headache']),
+    ("no appetite and tired with mild fever", [], ['Fatigue']),
+    # Full stops end a clause
+    ("no vomiting. fever since 2 days", [], ['Fever']),
+    # Misspellings are corrected before matching
+    ("mild diarrhoea and stomache", [], ['Abdominal pain']),
+    # Keywords only match at the start of a word
+    ("I had a shot yesterday", ['Fever'], []),
+    ("piano teacher has fever", [], ['Fever']),
+]
+
+
+@pytest.mark.parametrize("note,expected", BASELINE_NOTES)
+def test_matches_original_splitting(extractor, note, expected):
+    assert extractor.extract_symptoms(note) == expected
+
+
+@pytest.mark.parametrize("note,original,expected", CHANGED_NOTES)
+def test_clause_rule_changes(extractor, note, original, expected):
+    assert original != expected
+    assert extractor.extract_symptoms(note) == expected
+
+
+def test_negation_stays_in_its_clause(extractor):
+    assert extractor.extract_symptoms("fever, no vomiting") == ['Fever']
+    assert extractor.extract_symptoms("no vomiting but fever") == ['Fever']
+    assert extractor.extract_symptoms("no vomiting fever") == []
+
+
+def test_mild_modifier_stays_in_its_clause(extractor):
+    assert extractor.extract_symptoms("mild headache") == []
+    assert extractor.extract_symptoms("mild headache. vomiting") == ['Vomiting']
+    assert extractor.extract_symptoms("vomiting with mild headache") == ['Vomiting']
+
+
+def test_cache_does_not_change_results():
+    cached, uncached = SymptomExtractor(), SymptomExtractor(cache_size=0)
+    for note, _ in BASELINE_NOTES * 2:
+        assert cached.extract_symptoms(note) == uncached.extract_symptoms(note)
+    assert cached.cache_info()['hits'] > 0
+
+
+def test_unicode_and_case_are_folded(extractor):
+    assert extractor.extract_symptoms("FEVER and DIARRHÉA") == ['Fever', 'Diarrhea']
+    assert extractor.extract_symptoms("no fever — vomiting") == []
+
+
+def test_clauses():
+    tokenizer = NoteTokenizer()
+    assert tokenizer.clauses("Fever and chills; temp 38.5. Vomiting!") == ['fever', 'chills', 'temp 38.5', 'vomiting']
+    assert tokenizer.clauses("  Diarrhoea, Vomitting\n") == ['diarrhoea', 'vomitting']
+    assert tokenizer.normalize("Diarrhoea, Vomitting") == 'diarrhea, vomiting'
+
+
+def naive_word_starts(keywords, text):
+    """Every (start, keyword) where a keyword begins at a word start"""
+    found = set()
+    for keyword in keywords:
+        for match in re.finditer(re.escape(keyword), text):
+            start = match.start()
+            if start == 0 or not text[start - 1].isalnum():
+                found.add((start, keyword))
+    return found
+
+
+def test_word_start_matcher_finds_every_keyword():
+    rng = random.Random(7)
+    keywords = ["no", "not", "no appetite", "fever", "feverish", "vomit", "vomiting", "ache", "stomach ache", "mild"]
+    words = keywords + ["piano", "shot", "hot", "rache", "and", "severe", "x"]
+    matcher = WordStartMatcher(keywords)
+    for _ in range(300):
+        text = rng.choice([" ", ", "]).join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+        assert set(matcher.find_all(text)) == naive_word_starts(keywords, text)
+
+
+def test_word_start_matcher_scales_to_large_keyword_sets():
+    rng = random.Random(3)
+    syllables = ["ba", "ko", "ri", "mu", "te", "sa", "lo", "vi", "ne", "du", "pa", "gi"]
+    keywords = set()
+    while len(keywords) < 20000:
+        keywords.add(" ".join("".join(rng.choice(syllables) for _ in range(rng.randint(1, 3)))
+                              for _ in range(rng.randint(1, 3))))
+    keywords = sorted(keywords)
+
+    started = time.perf_counter()
+    matcher = WordStartMatcher(keywords)
+    assert time.perf_counter() - started < 10.0
+
+    sample = rng.sample(keywords, 50)
+    text = ", ".join(sample)
+    assert set(matcher.find_all(text)) == naive_word_starts(keywords, text)
+
+
+def test_trie_pattern_matches_the_word_set():
+    words = ["and", "an", "but", "with", "without"]
+    pattern = re.compile(trie_pattern(words))
+    for word in words:
+        assert pattern.fullmatch(word)
+    for other in ["a", "wit", "butt", ""]:
+        assert not pattern.fullmatch(other)
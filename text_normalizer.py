@@ -0,0 +1,101 @@
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+from keyword_matcher import trie_pattern
+
+
+# Punctuation that would not fold to ASCII on its own
+_PUNCTUATION = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u2032": "'",
+    "\u201c": '"', "\u201d": '"', "\u201e": '"',
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-", "\u2212": "-",
+    "\u00a0": " ", "\u2007": " ", "\u202f": " ", "\u3000": " ",
+    "\u2026": ".", "\u3002": ".", "\uff0c": ",", "\uff1b": ";", "\u2028": "\n", "\u2029": "\n",
+})
+
+# Misspellings seen in intake notes -> the spelling the symptom keywords use
+COMMON_MISSPELLINGS = {
+    "diarhea": "diarrhea", "diarrhoea": "diarrhea", "diarhoea": "diarrhea", "diarrea": "diarrhea",
+    "diarrohea": "diarrhea", "dairrhea": "diarrhea", "diahrrea": "diarrhea", "diarreah": "diarrhea",
+    "vomitting": "vomiting", "vommiting": "vomiting", "vomting": "vomiting", "vommit": "vomit",
+    "nausia": "nausea", "nausee": "nausea", "nauseus": "nauseous", "nautious": "nauseous",
+    "feaver": "fever", "fevar": "fever", "fver": "fever",
+    "headach": "headache", "headche": "headache", "hedache": "headache",
+    "stomache": "stomach ache", "stomachache": "stomach ache", "tummyache": "tummy ache",
+    "dehydation": "dehydration", "dehyderation": "dehydration", "dehidration": "dehydration",
+    "dizzyness": "dizziness", "dizzines": "dizziness",
+    "fatique": "fatigue", "fatige": "fatigue", "tierd": "tired",
+    "jaundis": "jaundice", "jaundise": "jaundice", "jondice": "jaundice",
+    "apetite": "appetite", "appitite": "appetite",
+}
+
+# Words that end one clause and start the next
+SEPARATOR_WORDS = ("and", "but", "with")
+
+_SEPARATOR_CHARS = ",;!?\r\n"
+
+
+def fold_unicode(text: str) -> str:
+    """Replace typographic punctuation and strip accents (e.g. 'fièvre' -> 'fievre')"""
+    text = unicodedata.normalize("NFKD", text.translate(_PUNCTUATION))
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+class NoteTokenizer:
+    """
+    Normalizes free-text notes and splits them into clauses
+
+    All patterns are compiled once, when the tokenizer is created.
+    normalize() folds Unicode and case (fold()) and fixes common
+    misspellings (correct_spelling()).
+    Clauses end at commas, semicolons, full stops (not decimal points),
+    ! and ?, newlines and the SEPARATOR_WORDS.
+    """
+
+    def __init__(self, misspellings: Optional[Dict[str, str]] = None,
+                 separator_words: Iterable[str] = SEPARATOR_WORDS):
+        self.misspellings = dict(COMMON_MISSPELLINGS if misspellings is None else misspellings)
+        self.separator_words = tuple(separator_words)
+
+        self._misspelling_pattern = None
+        if self.misspellings:
+            self._misspelling_pattern = re.compile(r"\b" + trie_pattern(self.misspellings) + r"\b")
+
+        separators = [f"[{re.escape(_SEPARATOR_CHARS)}]", r"\.(?!\d)"]
+        first_chars = _SEPARATOR_CHARS + "."
+        if self.separator_words:
+            separators.append(r"\b" + trie_pattern(self.separator_words) + r"\b")
+            first_chars += "".join(word[0] for word in self.separator_words)
+        # The lookahead lets the regex engine skip positions that cannot start a separator
+        self._separator_pattern = re.compile(f"(?=[{re.escape(first_chars)}])(?:" + "|".join(separators) + ")")
+
+    def normalize(self, text: str) -> str:
+        """Fold Unicode and case and correct misspellings"""
+        return self.correct_spelling(self.fold(text))
+
+    @staticmethod
+    def fold(text: str) -> str:
+        """Fold Unicode (accents, typographic punctuation) and case"""
+        if not text.isascii():
+            text = fold_unicode(text)
+        return text.casefold()
+
+    def correct_spelling(self, text: str) -> str:
+        """Replace the misspelled words of folded text"""
+        if self._misspelling_pattern is None:
+            return text
+        return self._misspelling_pattern.sub(self._correct, text)
+
+    def _correct(self, match: "re.Match") -> str:
+        return self.misspellings[match.group()]
+
+    def clauses(self, text: str) -> List[str]:
+        """
+        Fold text and return the texts of its clauses, without offsets
+        Spelling is not corrected yet. Callers that cache results per clause
+        call correct_spelling() on a cache miss, so a repeated clause only
+        pays for it once.
+        """
+        return [part.strip() for part in self._separator_pattern.split(self.fold(text))
+                if part and not part.isspace()]
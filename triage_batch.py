@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from diagnosis_engine import DiagnosisEngine, SymptomExtractor, load_diseases_data
+
+
+def iter_records(lines: Iterable[str], fmt: str = "text",
+                 text_field: str = "text", id_field: str = "id") -> Iterator[Dict]:
+    """
+    Stream intake note records from newline-delimited input
+    Each record is {'id': ..., 'text': ...}; plain text lines are numbered
+    JSONL lines that are not objects, or whose text is not a string, are
+    reported on stderr and skipped.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        if fmt == "jsonl":
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping line {line_no}: invalid JSON ({e})", file=sys.stderr)
+                continue
+            if not isinstance(record, dict):
+                print(f"Skipping line {line_no}: expected a JSON object", file=sys.stderr)
+                continue
+            text = record.get(text_field)
+            if text is None:
+                text = ""
+            elif not isinstance(text, str):
+                print(f"Skipping line {line_no}: '{text_field}' is not a string", file=sys.stderr)
+                continue
+            yield {'id': record.get(id_field, line_no), 'text': text}
+        else:
+            yield {'id': line_no, 'text': line.rstrip("\r\n")}
+
+
+def summarize_matches(matches: List[Dict], top: int) -> List[Dict]:
+    """Reduce match_symptoms results to the compact fields written to output"""
+    return [
+        {
+            'id': match['disease'].get('id'),
+            'name': match['disease'].get('name'),
+            'confidence': match['confidence'],
+            'match_count': match['match_count']
+        }
+        for match in matches[:top]
+    ]
+
+
+def triage_records(records: Iterable[Dict], extractor: SymptomExtractor,
+                   engine: Optional[DiagnosisEngine] = None, top: int = 3) -> Iterator[Dict]:
+    """Extract symptoms (and optionally diagnoses) for each record as it arrives"""
+    for record in records:
+        symptoms = extractor.extract_symptoms(record['text'])
+        result = {'id': record['id'], 'symptoms': symptoms}
+        if engine is not None:
+            result['diagnoses'] = summarize_matches(engine.match_symptoms(symptoms, limit=top), top)
+        yield result
+
+
+_worker_extractor: Optional[SymptomExtractor] = None
+_worker_engine: Optional[DiagnosisEngine] = None
+_worker_top = 3
+
+
+def _init_worker(diseases_path: Optional[str], top: int, cache_size: int = 4096):
+    """Build the extractor and engine once per worker process"""
+    global _worker_extractor, _worker_engine, _worker_top
+    _worker_extractor = SymptomExtractor(cache_size=cache_size)
+    _worker_engine = DiagnosisEngine(load_diseases_data(diseases_path)) if diseases_path else None
+    _worker_top = top
+
+
+def _triage_chunk(chunk: List[Dict]) -> Tuple[int, Dict[str, int], List[Dict]]:
+    """
+    Process one chunk of records inside a worker process
+    Returns (worker pid, its segment cache counters so far, results)
+    """
+    symptom_lists = [_worker_extractor.extract_symptoms(record['text']) for record in chunk]
+    results = [{'id': record['id'], 'symptoms': symptoms} for record, symptoms in zip(chunk, symptom_lists)]
+    if _worker_engine is not None:
+        for result, matches in zip(results, _worker_engine.match_symptoms_batch(symptom_lists, limit=_worker_top)):
+            result['diagnoses'] = summarize_matches(matches, _worker_top)
+    return os.getpid(), _worker_extractor.cache_info(), results
+
+
+def iter_chunks(records: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    """Group a record stream into lists of at most chunk_size records"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def combine_cache_info(infos: Iterable[Dict[str, int]]) -> Dict[str, int]:
+    """Sum segment cache counters from several extractors"""
+    total = {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 0}
+    for info in infos:
+        for key in total:
+            total[key] += info[key]
+    return total
+
+
+def parallel_triage_records(records: Iterable[Dict], workers: int, chunk_size: int = 256,
+                            diseases_path: Optional[str] = None, top: int = 3, cache_size: int = 4096,
+                            cache_stats: Optional[Dict[int, Dict[str, int]]] = None) -> Iterator[Dict]:
+    """
+    Shard records across a process pool and yield results in input order
+    Diagnoses are included when diseases_path is given. At most two chunks
+    per worker are in flight, so memory stays bounded on unbounded input.
+    If cache_stats is given, it is filled with each worker's latest segment
+    cache counters, keyed by pid.
+    """
+    def collect(future):
+        pid, info, results = future.result()
+        if cache_stats is not None:
+            cache_stats[pid] = info
+        return results
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(diseases_path, top, cache_size)) as executor:
+        pending = deque()
+        for chunk in iter_chunks(records, chunk_size):
+            pending.append(executor.submit(_triage_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from collect(pending.popleft())
+        while pending:
+            yield from collect(pending.popleft())
+
+
+def write_jsonl(results: Iterable[Dict], out: TextIO) -> int:
+    """Write results one JSON line at a time; returns the number written"""
+    count = 0
+    for result in results:
+        out.write(json.dumps(result, ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def detect_format(path: str) -> str:
+    """Guess the input format from the file extension"""
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "text"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Extract symptoms from large newline-delimited intake note files"
+    )
+    parser.add_argument("input", help="Input file (plain text or JSONL), or '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout)")
+    parser.add_argument("--format", choices=["auto", "text", "jsonl"], default="auto",
+                        help="Input format (default: guess from file extension)")
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the note text")
+    parser.add_argument("--id-field", default="id", help="JSONL field holding the record id")
+    parser.add_argument("--diagnose", action="store_true", help="Also run disease matching")
+    parser.add_argument("--diseases", default="diseases.json", help="Disease catalog used with --diagnose")
+    parser.add_argument("--top", type=int, default=3, help="Number of diagnoses kept per record")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; 1 runs in-process, 0 uses every CPU core")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Records sent to a worker at a time")
+    parser.add_argument("--cache-size", type=int, default=4096,
+                        help="Segments kept in each extractor's LRU cache (0 disables it)")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="Report segment cache hits and misses on stderr")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    fmt = args.format
+    if fmt == "auto":
+        fmt = detect_format(args.input)
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", errors="replace")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        records = iter_records(source, fmt, args.text_field, args.id_field)
+        worker_stats: Dict[int, Dict[str, int]] = {}
+        extractor = None
+        if workers > 1:
+            diseases_path = args.diseases if args.diagnose else None
+            results = parallel_triage_records(records, workers, max(args.chunk_size, 1), diseases_path, args.top,
+                                              args.cache_size, worker_stats)
+        else:
+            extractor = SymptomExtractor(cache_size=args.cache_size)
+            engine = DiagnosisEngine(load_diseases_data(args.diseases)) if args.diagnose else None
+            results = triage_records(records, extractor, engine, args.top)
+        count = write_jsonl(results, sink)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(f"Processed {count} record(s)", file=sys.stderr)
+    if args.cache_stats:
+        info = extractor.cache_info() if extractor is not None else combine_cache_info(worker_stats.values())
+        lookups = info['hits'] + info['misses']
+        hit_rate = info['hits'] / lookups * 100 if lookups else 0.0
+        print(f"Segment cache: {info['hits']} hits, {info['misses']} misses ({hit_rate:.1f}% hit rate), "
+              f"{info['size']}/{info['maxsize']} entries", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import flet as ft
+
+
+class ViewCache:
+    """
+    Per-session cache of built page trees, keyed by route
+
+    Every view that has been built stays in page.controls and navigation only
+    toggles visibility, so the client receives each tree once and later
+    visits send just the visibility changes. A route is rebuilt when the
+    inputs it was built from change. Controls are bound to one page, so the
+    cache cannot be shared between sessions.
+    """
+
+    def __init__(self, page: ft.Page):
+        self.page = page
+        self._views: Dict[str, Tuple[Tuple[Hashable, ...], ft.Control]] = {}
+        self.builds = 0
+
+    def show(self, route: str, inputs: Tuple[Hashable, ...],
+             build: Optional[Callable[[], ft.Control]]) -> Optional[ft.Control]:
+        """
+        Make route the only visible view, building it first if it was never
+        built or its inputs differ from the last build
+        """
+        for cached_route, (_, view) in self._views.items():
+            view.visible = cached_route == route
+
+        entry = self._views.get(route)
+        if entry is not None and entry[0] == inputs:
+            return entry[1]
+
+        if entry is not None:
+            self.page.controls.remove(entry[1])
+            del self._views[route]
+        if build is None:
+            return None
+
+        view = build()
+        view.visible = True
+        self.builds += 1
+        self._views[route] = (inputs, view)
+        self.page.controls.append(view)
+        return view
+
+    def invalidate(self, route: Optional[str] = None):
+        """Drop one cached route (or all of them); it is rebuilt on its next visit"""
+        routes = [route] if route is not None else list(self._views)
+        for name in routes:
+            entry = self._views.pop(name, None)
+            if entry is not None:
+                self.page.controls.remove(entry[1])
@@ -2,7 +2,13 @@ import flet as ft
 import json
 from typing import List, Dict
 from pages import *
-from diagnosis_engine import DiagnosisEngine
+from diagnosis_engine import canonical_symptoms
+from services import get_services
+from instrumentation import RouteInstrumentation, get_metrics
+from view_cache import ViewCache
+
+# Views that show a patient's input or results; going home starts a new patient
+PATIENT_ROUTES = ("symptoms", "result", "hospitals")
 
 def main(page: ft.Page):
     page.title = "WaterWise - Water-borne Disease Detection"
@@ -17,32 +23,64 @@ def main(page: ft.Page):
     }
     page.theme = ft.Theme(font_family="Inter")
     
-    diseases_data = load_diseases_data()
-    diagnosis_engine = DiagnosisEngine(diseases_data)
+    services = get_services()
     
     app_state = {
         'selected_symptoms': [],
         'diagnosis_result': None
     }
     
+    views = ViewCache(page)
+    
+    metrics = get_metrics()
+    instrumentation = RouteInstrumentation(page, metrics) if metrics is not None else None
+    
+    def service(target, label: str):
+        """The service itself, or a timing proxy when metrics are enabled"""
+        return instrumentation.wrap_service(target, label) if instrumentation is not None else target
+    
+    builders = {
+        "home": lambda: create_welcome_page(page, navigate_to),
+        "symptoms": lambda: create_symptom_input_page(page, navigate_to, app_state,
+                                                      service(services.symptom_extractor, "extractor")),
+        "result": lambda: create_result_page(page, navigate_to, app_state,
+                                             service(services.diagnosis_engine, "engine")),
+        "learn": lambda: create_learn_page(page, navigate_to),
+        "about": lambda: create_about_page(page, navigate_to),
+        "hospitals": lambda: create_hospital_finder_page(page, navigate_to, app_state,
+                                                         service(services.hospital_finder, "finder")),
+    }
+    if instrumentation is not None:
+        builders = {route: instrumentation.wrap_builder(build) for route, build in builders.items()}
+    
+    def route_inputs(route: str) -> tuple:
+        """What a route's view is built from; the view is rebuilt when this changes"""
+        if route == "symptoms":
+            return (services.symptom_extractor,)
+        if route == "result":
+            return (canonical_symptoms(app_state.get('selected_symptoms', [])), services.diagnosis_engine)
+        if route == "hospitals":
+            return (app_state.get('detected_disease'), services.hospital_finder)
+        return ()
+    
+    def start_over():
+        """Forget the current patient: their input, results and the cached views showing them"""
+        app_state['selected_symptoms'] = []
+        app_state['diagnosis_result'] = None
+        app_state.pop('symptom_text', None)
+        app_state.pop('detected_disease', None)
+        for route in PATIENT_ROUTES:
+            views.invalidate(route)
+    
     def navigate_to(route):
-        page.controls.clear()
-        
         if route == "home":
-            page.add(create_welcome_page(page, navigate_to))
-        elif route == "symptoms":
-            page.add(create_symptom_input_page(page, navigate_to, app_state))
-        elif route == "result":
-            page.add(create_result_page(page, navigate_to, app_state, diagnosis_engine))
-        elif route == "learn":
-            page.add(create_learn_page(page, navigate_to))
-        elif route == "about":
-            page.add(create_about_page(page, navigate_to))
-        elif route == "hospitals":
-            page.add(create_hospital_finder_page(page, navigate_to, app_state))
-        
+            start_over()
+        views.show(route, route_inputs(route), builders.get(route))
         page.update()
     
+    if instrumentation is not None:
+        navigate_to = instrumentation.wrap_navigate(navigate_to)
+    
     navigate_to("home")
 
 if __name__ == "__main__":